@@ -2,29 +2,26 @@ import asyncio
 from search.utils.llm_chat import ChatCompletionGenerator
 
 
-def chat_sync():
-    chat = ChatCompletionGenerator()
-
+async def run_all(chat: ChatCompletionGenerator):
+    # The three calls are independent, so run them concurrently
+    responses = await asyncio.gather(
         # Using raw messages
-    response = chat.generate([
-        {"role": "system", "content": "You are a helpful assistant."},
-        {"role": "user", "content": "What is Python?"}
-    ])
-    print(response)
-    # Using simplified method
-    response = chat.generate_with_context(
-        system_prompt="You are a helpful assistant.",
-        user_message="What is Python?",
-        temperature=0.5
+        chat.generate_async([
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "What is Python?"}
+        ]),
+        # Using simplified method
+        chat.generate_with_context_async(
+            system_prompt="You are a helpful assistant.",
+            user_message="What is Python?",
+            temperature=0.5
+        ),
+        chat.generate_with_context_async("You are helpful.", "Hello!")
     )
-    print(response)
-    # Synchronous
-    response = chat.generate_with_context("You are helpful.", "Hello!")
-    print(response)
-
-async def chat_async():
-    chat = ChatCompletionGenerator()
+    for response in responses:
+        print(response)
 
+async def chat_async(chat: ChatCompletionGenerator):
     response = await chat.generate_with_context_async("You are helpful.", "Hello!")
     print(response)
 
@@ -32,6 +29,10 @@ async def chat_async():
     async for chunk in chat.generate_with_context_stream("You are helpful.", "Hello!"):
         print(chunk, end="", flush=True)
 
-chat_sync()
+async def main():
+    # One generator so both runs share the same async client pool
+    chat = ChatCompletionGenerator()
+    await run_all(chat)
+    await chat_async(chat)
 
-asyncio.run(chat_async())
+asyncio.run(main())
@@ -1,9 +1,11 @@
+import io
 import lxml.etree
 from typing import Any, Iterator
 
-xmlp = lxml.etree.XMLParser(
-    recover=True, remove_comments=True, resolve_entities=False
-)
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+NS = f"{{{SITEMAP_NS}}}"
+NS_LEN = len(NS)
+URL_TAG = f"{NS}url"
 
 xmltext = """
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
@@ -24,31 +26,65 @@ xmltext = """
 </urlset>
 """
 
+# Full tag -> local name for tags outside the sitemap namespace, filled on
+# first sight of each tag.
+_LOCAL: dict[str, str] = {}
+
 def extract(elem) -> dict[str, Any]:
     d: dict[str, Any] = {}
-    for el in elem.getchildren():
-        tag = el.tag
-        assert isinstance(tag, str)
-        name = tag.split("}", 1)[1] if "}" in tag else tag
-
-        if name == "link":
-            if "href" in el.attrib:
-                d.setdefault("alternate", []).append(el.get("href"))
-        else:
-            if el.text and el.text.strip():
-                d[name] = el.text.strip()
+    # Worklist of (element, dict receiving its children) instead of recursion
+    stack = [(elem, d)]
+    while stack:
+        node, out = stack.pop()
+        for el in node:
+            tag = el.tag
+            if tag.startswith(NS):
+                name = tag[NS_LEN:]
+            else:
+                name = _LOCAL.get(tag) or _LOCAL.setdefault(tag, tag.rpartition("}")[2])
+
+            if name == "link":
+                href = el.get("href")
+                if href is not None:
+                    out.setdefault("alternate", []).append(href)
             else:
-                d[name] = extract(el)
+                text = el.text
+                stripped = text.strip() if text else ""
+                if stripped:
+                    out[name] = stripped
+                else:
+                    sub: dict[str, Any] = {}
+                    out[name] = sub
+                    stack.append((el, sub))
     return d
 
-def iterate(root) -> Iterator[dict[str, Any]]:
-    for elem in root.getchildren():
+def iterate(source) -> Iterator[dict[str, Any]]:
+    """Stream <url> entries from a sitemap file object or bytes.
+
+    Each <url> element is cleared once extracted, and already processed
+    siblings are dropped from the root, so memory stays bounded by a single
+    entry instead of the whole sitemap.
+    """
+    if isinstance(source, (bytes, str)):
+        source = io.BytesIO(source.encode() if isinstance(source, str) else source)
+
+    for _, elem in lxml.etree.iterparse(
+        source,
+        events=("end",),
+        tag=URL_TAG,
+        recover=True,
+        huge_tree=False,
+        remove_comments=True,
+        resolve_entities=False,
+    ):
         d = extract(elem)
         if "loc" in d:
             yield d
 
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
 
-root = lxml.etree.fromstring(xmltext, parser=xmlp)
 
-for elem in iter(root):
-    print(elem)
\ No newline at end of file
+for entry in iterate(xmltext.strip()):
+    print(entry)
@@ -9,8 +9,11 @@ setup(
         "scrapy",
         "pyyaml",
         "click",  # for CLI
+        "orjson",  # fast JSON parsing on the search path
+        "uvloop",  # event loop for the API server
+        "httptools",  # HTTP parser for the API server
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     entry_points={
         'console_scripts': [
             'search=search:main',
@@ -1,14 +1,32 @@
 """Search results formatter."""
 import os
-import json
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+import heapq
+from itertools import chain, islice
+import orjson
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Any
 from ..utils.config import load_config
 from ..utils.storage import load_metadata
 from ..utils.product_utils import get_product_handle
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4096)
+def _load_product_file(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a product file; mtime is part of the key so rewrites invalidate it."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+@lru_cache(maxsize=8)
+def _load_product_urls(path: str, mtime_ns: int, size: int) -> FrozenSet[str]:
+    """Product URLs of a sitemap metadata file, keyed like load_metadata's cache."""
+    return frozenset(
+        url for url, metadata in load_metadata(path).items()
+        if metadata.get("page_type") == "product"
+    )
+
 class BaseFormatter:
     """Base formatter class."""
     def format(self, result: Dict[str, Any], metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -24,14 +42,17 @@ class ProductFormatter(BaseFormatter):
         """Load extracted product data from products directory."""
         product_file = os.path.join(self.site_dir, 'products', f"{get_product_handle(url)}.json")
         try:
-            with open(product_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return _load_product_file(product_file, os.path.getmtime(product_file))
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
             logger.warning(f"Failed to load product data for {url}: {str(e)}")
             return None
 
     def format(self, result: Dict[str, Any], metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        product_data = self.get_product_data(result["url"])
+        return self.build(result, metadata, self.get_product_data(result["url"]))
+
+    def build(self, result: Dict[str, Any], metadata: Dict[str, Any],
+              product_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Format a result from already loaded product data."""
         if not product_data:
             return None
 
@@ -79,28 +100,59 @@ class SearchResultFormatter:
         }
 
         # Load sitemap metadata
-        sitemap_file = os.path.join(site_dir, 'sitemap_metadata.json')
-        if not os.path.exists(sitemap_file):
+        sitemap_file = os.path.abspath(os.path.join(site_dir, 'sitemap_metadata.json'))
+        try:
+            st = os.stat(sitemap_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Sitemap metadata not found: {sitemap_file}")
         self.sitemap_metadata = load_metadata(sitemap_file)
 
-    def format_results(self, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Format search results into API response format."""
-        # Apply product boost to scores
-        for result in search_results:
+        # A formatter is built per request, so the product URL set is cached
+        # per file version instead of walking the sitemap every time
+        self._product_urls = _load_product_urls(sitemap_file, st.st_mtime_ns, st.st_size)
+
+    def _ranked(self, search_results: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield results in order of boosted score, highest first.
+
+        The heap is built in O(n) and popped lazily, so only the results the
+        caller actually consumes are ordered. Ties keep their input order.
+        """
+        product_urls = self._product_urls
+        boost = self.product_boost
+        heap = []
+        for i, result in enumerate(search_results):
+            score = result["score"]
+            if result["url"] in product_urls:
+                score *= boost
+            heap.append((-score, i, result))
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[2]
+
+    def _product_candidates(self, ranked: Iterable[Dict[str, Any]]
+                            ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Yield (result, metadata) for ranked results that are products."""
+        for result in ranked:
             url = result["url"]
             metadata = self.sitemap_metadata.get(url)
-            if metadata and metadata["page_type"] == "product":
-                result["score"] *= self.product_boost
+            if not metadata:
+                logger.warning(f"No sitemap metadata found for URL: {url}")
+                continue
+
+            chunk_type = result.get("chunk_type", metadata.get("page_type"))
+            if chunk_type == "product":
+                yield result, metadata
 
-        # Sort results by boosted score
-        sorted_results = sorted(search_results, key=lambda x: x["score"], reverse=True)
+    async def format_results(self, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Format search results into API response format."""
+        # Rank by product-boosted score
+        ranked = self._ranked(search_results)
 
-        if not sorted_results:
+        first_result = next(ranked, None)
+        if first_result is None:
             return {"products": [], "answer": None}
 
         # Process first result
-        first_result = sorted_results[0]
         first_url = first_result["url"]
         first_metadata = self.sitemap_metadata.get(first_url)
 
@@ -118,21 +170,23 @@ class SearchResultFormatter:
                 "answer": formatter.format(first_result, first_metadata)
             }
 
-        # Otherwise, return only products
+        # Otherwise, return only products. Product files are read in batches
+        # sized to the remaining shortfall, each batch concurrently off the
+        # event loop, so a cold cache costs one disk round trip per batch.
+        product_formatter = self.formatters["product"]
+        candidates = self._product_candidates(chain((first_result,), ranked))
         products = []
-        for result in sorted_results:
-            if len(products) >= self.max_products:
+        while len(products) < self.max_products:
+            batch = list(islice(candidates, self.max_products - len(products)))
+            if not batch:
                 break
 
-            url = result["url"]
-            metadata = self.sitemap_metadata.get(url)
-            if not metadata:
-                logger.warning(f"No sitemap metadata found for URL: {url}")
-                continue
-
-            chunk_type = result.get("chunk_type", metadata.get("page_type"))
-            if chunk_type == "product":
-                formatted_product = self.formatters["product"].format(result, metadata)
+            product_data = await asyncio.gather(*[
+                asyncio.to_thread(product_formatter.get_product_data, result["url"])
+                for result, _ in batch
+            ])
+            for (result, metadata), data in zip(batch, product_data):
+                formatted_product = product_formatter.build(result, metadata, data)
                 if formatted_product:
                     products.append(formatted_product)
 
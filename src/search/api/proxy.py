@@ -1,50 +1,95 @@
+from typing import Optional
 from fastapi import FastAPI, HTTPException
 import httpx
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def proxy_request(url: str):
-    """Proxy the request and strip out security headers."""
+# Shared client so connections (and HTTP/2 streams) are reused across requests.
+_client: Optional[httpx.AsyncClient] = None
+
+# Lowercased response headers that are dropped before proxying: the framing
+# restrictions, and hop-by-hop headers that only apply to the upstream
+# connection. Content-Encoding and Content-Length are kept because the body
+# is forwarded still compressed.
+_STRIP = frozenset({
+    "x-frame-options", "content-security-policy",
+    "connection", "keep-alive", "transfer-encoding"
+})
+
+# Bytes read from the upstream per streamed chunk
+_CHUNK_SIZE = 128 * 1024
+
+def _create_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client used for all proxied requests."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared proxy client, creating it if startup has not run."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+async def start_client():
+    """Create the shared proxy client (FastAPI startup hook)."""
+    get_client()
+
+async def close_client():
+    """Close the shared proxy client (FastAPI shutdown hook)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def proxy_request(url: str, accept_encoding: str = "identity"):
+    """Proxy the request and strip out security headers.
+
+    Args:
+        url: Upstream URL to fetch
+        accept_encoding: The caller's Accept-Encoding header, forwarded upstream
+    """
     try:
-        # Set Accept-Encoding to identity to avoid receiving compressed data.
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={"Accept-Encoding": "identity"},
-                follow_redirects=True
-            )
-
-            # Log original headers
-            logger.debug(f"Original headers for {url}: {response.headers}")
-
-            # Create a new response without restrictive security headers
-            headers = dict(response.headers)
-
-            # Remove headers that prevent framing
-            headers.pop('x-frame-options', None)
-            headers.pop('X-Frame-Options', None)
-            headers.pop('content-security-policy', None)
-            headers.pop('Content-Security-Policy', None)
-
-            # Remove potential Content-Encoding header to avoid confusion
-            headers.pop('content-encoding', None)
-            headers.pop('Content-Encoding', None)
-
-            # Add permissive headers
-            headers['Access-Control-Allow-Origin'] = '*'
-            headers['Content-Security-Policy'] = "frame-ancestors *"
-
-            # Log modified headers
-            logger.debug(f"Modified headers for {url}: {headers}")
-
-            return StreamingResponse(
-                content=response.iter_bytes(),
-                status_code=response.status_code,
-                headers=headers,
-                media_type=response.headers.get('content-type')
-            )
+        # Ask upstream only for encodings the caller accepts, and pass the body
+        # through undecoded; the caller decompresses it using the forwarded
+        # Content-Encoding.
+        # The body is streamed: send() returns once headers arrive, and the
+        # upstream response is closed after the last chunk is forwarded.
+        # Reads are 128 KiB so large assets take fewer event loop wakeups.
+        client = get_client()
+        request = client.build_request(
+            "GET",
+            url,
+            headers={"Accept-Encoding": accept_encoding}
+        )
+        response = await client.send(request, stream=True, follow_redirects=True)
+
+        # Log original headers
+        logger.debug(f"Original headers for {url}: {response.headers}")
+
+        # Create a new response without restrictive security headers
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _STRIP}
+
+        # Add permissive headers
+        headers['Access-Control-Allow-Origin'] = '*'
+        headers['Content-Security-Policy'] = "frame-ancestors *"
+
+        # Log modified headers
+        logger.debug(f"Modified headers for {url}: {headers}")
+
+        return StreamingResponse(
+            content=response.aiter_raw(chunk_size=_CHUNK_SIZE),
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.headers.get('content-type'),
+            background=BackgroundTask(response.aclose)
+        )
     except Exception as e:
         logger.error(f"Proxy error for {url}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to proxy request: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to proxy request: {str(e)}")
@@ -0,0 +1,139 @@
+"""In-memory cache of formatted search responses."""
+import time
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SearchResponseCache:
+    """Two-tier cache for search responses.
+
+    The exact tier maps (domain, query, limit) to a response. The semantic tier
+    keeps the most recent query embeddings per (domain, limit) and returns the
+    response of a near-duplicate query whose cosine similarity reaches the
+    threshold, so rephrased queries skip the Elasticsearch round trip as well.
+    Both tiers expire entries after ttl seconds.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024,
+                 similarity_threshold: float = 0.92, max_embeddings: int = 256):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a cached response stays valid
+            max_entries: Maximum number of exact-match entries
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_embeddings: Maximum embeddings kept per (domain, limit)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.max_embeddings = max_embeddings
+        self._exact: "OrderedDict[Tuple[str, str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._semantic: Dict[Tuple[str, int], Deque[Tuple[float, np.ndarray, Dict[str, Any]]]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SearchResponseCache":
+        """Create a cache from the ``api.search.cache`` config section."""
+        cache_config = config.get("api", {}).get("search", {}).get("cache", {})
+        return cls(
+            ttl=cache_config.get("ttl", 60.0),
+            max_entries=cache_config.get("max_entries", 1024),
+            similarity_threshold=cache_config.get("similarity_threshold", 0.92),
+            max_embeddings=cache_config.get("max_embeddings", 256)
+        )
+
+    @staticmethod
+    def _key(domain: str, query: str, limit: int) -> Tuple[str, str, int]:
+        return domain, query.strip(), limit
+
+    def get(self, domain: str, query: str, limit: int) -> Optional[Dict[str, Any]]:
+        """Look up an exact query match.
+
+        Args:
+            domain: Domain searched
+            query: Query text
+            limit: Result limit of the search
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached response, or None on a miss
+        """
+        key = self._key(domain, query, limit)
+        entry = self._exact.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.monotonic():
+            del self._exact[key]
+            return None
+        self._exact.move_to_end(key)
+        return response
+
+    def get_similar(self, domain: str, limit: int, query_vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Look up the response of the most similar recent query.
+
+        Args:
+            domain: Domain searched
+            limit: Result limit of the search
+            query_vector: Embedding of the query
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached response if a recent query is at
+                least similarity_threshold similar, otherwise None
+        """
+        entries = self._semantic.get((domain, limit))
+        if not entries:
+            return None
+
+        # Drop expired entries; the deque is ordered oldest first
+        now = time.monotonic()
+        while entries and entries[0][0] < now:
+            entries.popleft()
+        if not entries:
+            return None
+
+        query = self._normalize(query_vector)
+        similarities = np.stack([vector for _, vector, _ in entries]) @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        logger.debug(f"Semantic cache hit for {domain} (similarity {similarities[best]:.3f})")
+        return entries[best][2]
+
+    def put(self, domain: str, query: str, limit: int, query_vector: np.ndarray,
+            response: Dict[str, Any]) -> None:
+        """Cache a response under both tiers.
+
+        Args:
+            domain: Domain searched
+            query: Query text
+            limit: Result limit of the search
+            query_vector: Embedding of the query
+            response: Formatted search response
+        """
+        expires = time.monotonic() + self.ttl
+
+        key = self._key(domain, query, limit)
+        self._exact[key] = (expires, response)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+
+        entries = self._semantic.get((domain, limit))
+        if entries is None:
+            entries = self._semantic[(domain, limit)] = deque(maxlen=self.max_embeddings)
+        entries.append((expires, self._normalize(query_vector), response))
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._exact.clear()
+        self._semantic.clear()
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
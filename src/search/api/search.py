@@ -1,21 +1,36 @@
 """Search API implementation."""
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 import numpy as np
-from elasticsearch import Elasticsearch
-from fastapi import FastAPI, HTTPException
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.serializer import OrjsonSerializer
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from ..utils.config import load_config
 from ..utils.embeddings import EmbeddingsGenerator
 from .formatter import SearchResultFormatter
-from .proxy import proxy_request
+from .response_cache import SearchResponseCache
+from .proxy import proxy_request, start_client, close_client
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Semantic Search API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared HTTP clients on startup and close them on shutdown."""
+    await start_client()
+    yield
+    await close_client()
+    for es in _es_clients.values():
+        await es.close()
+    _es_clients.clear()
+
+app = FastAPI(title="Semantic Search API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configure CORS with sensible defaults
 app.add_middleware(
@@ -26,6 +41,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shared across requests; response caches are per domain, built from that
+# domain's config on its first request
+_response_caches: Dict[str, SearchResponseCache] = {}
+_embeddings: Optional[EmbeddingsGenerator] = None
+# One client (and connection pool) per cluster, shared by every domain on it
+_es_clients: Dict[str, AsyncElasticsearch] = {}
+
+def get_embeddings() -> EmbeddingsGenerator:
+    """Get the shared embeddings generator."""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = EmbeddingsGenerator()
+    return _embeddings
+
+def get_es_client(uri: str) -> AsyncElasticsearch:
+    """Get the shared async Elasticsearch client for a cluster URI."""
+    es = _es_clients.get(uri)
+    if es is None:
+        # httpx is already used by the proxy, so reuse it as the transport.
+        # orjson serializes the NumPy query vector directly, without tolist().
+        es = _es_clients[uri] = AsyncElasticsearch(
+            uri,
+            node_class="httpxasync",
+            serializer=OrjsonSerializer(),
+            request_timeout=10,
+            http_compress=True
+        )
+    return es
+
+def get_response_cache(domain: str, config: Dict[str, Any]) -> Optional[SearchResponseCache]:
+    """Get the search response cache of a domain, or None if it is disabled."""
+    if not config["api"]["search"].get("cache", {}).get("enabled", True):
+        return None
+    cache = _response_caches.get(domain)
+    if cache is None:
+        cache = _response_caches[domain] = SearchResponseCache.from_config(config)
+    return cache
+
 class ProductResult(BaseModel):
     """Product search result."""
     url: str
@@ -44,8 +97,18 @@ class SearchResponse(BaseModel):
     products: List[ProductResult]
     answer: Optional[Answer]
 
+def make_search_response(results: Dict[str, Any], config: Dict[str, Any]) -> ORJSONResponse:
+    """Serialize formatted results with orjson.
+
+    Validation against SearchResponse copies the whole result, so it only
+    runs when api.search.validate_response is enabled.
+    """
+    if config["api"]["search"].get("validate_response", False):
+        results = SearchResponse(**results).model_dump()
+    return ORJSONResponse(results)
+
 @app.get("/search/{domain}", response_model=SearchResponse)
-async def search(domain: str, query: str, limit: int = 20) -> SearchResponse:
+async def search(domain: str, query: str, limit: int = 20) -> ORJSONResponse:
     """Search documents in domain index.
 
     Args:
@@ -54,29 +117,43 @@ async def search(domain: str, query: str, limit: int = 20) -> SearchResponse:
         limit: Maximum number of results to return
 
     Returns:
-        SearchResponse containing products and answer
+        ORJSONResponse with a SearchResponse body of products and answer
     """
     try:
-        # Initialize elasticsearch client
         config = load_config(domain)
-        es = Elasticsearch(config["elasticsearch"]["uri"])
+
+        # Serve repeated queries from the response cache
+        cache = get_response_cache(domain, config)
+        if cache:
+            cached = cache.get(domain, query, limit)
+            if cached is not None:
+                return make_search_response(cached, config)
+
+        # Get the shared elasticsearch client
+        es = get_es_client(config["elasticsearch"]["uri"])
 
         # Check if index exists
-        if not es.indices.exists(index=domain):
+        if not await es.indices.exists(index=domain):
             raise HTTPException(
                 status_code=404,
                 detail=f"Index not found for domain: {domain}"
             )
 
         # Generate query embedding
-        embeddings = EmbeddingsGenerator()
-        query_vector = embeddings.generate_single(query)
+        # The OpenAI and cache calls block, so run them off the event loop
+        query_vector = await asyncio.to_thread(get_embeddings().generate_single, query)
+
+        # Near-duplicate queries reuse a recent response
+        if cache:
+            cached = cache.get_similar(domain, limit, query_vector)
+            if cached is not None:
+                return make_search_response(cached, config)
 
         # Construct search query
         search_query = {
             "knn": {
                 "field": "chunks.vector",
-                "query_vector": query_vector.tolist(),
+                "query_vector": query_vector,
                 "k": limit,
                 "num_candidates": limit * 2
             },
@@ -84,7 +161,7 @@ async def search(domain: str, query: str, limit: int = 20) -> SearchResponse:
         }
 
         # Execute search
-        response = es.search(
+        response = await es.search(
             index=domain,
             body=search_query,
             size=limit
@@ -117,9 +194,11 @@ async def search(domain: str, query: str, limit: int = 20) -> SearchResponse:
         site_dir = os.path.join(data_dir, domain)
         formatter = SearchResultFormatter(site_dir, config)
 
-        formatted_results = formatter.format_results(raw_results)
+        formatted_results = await formatter.format_results(raw_results)
+        if cache:
+            cache.put(domain, query, limit, query_vector, formatted_results)
 
-        return SearchResponse(**formatted_results)
+        return make_search_response(formatted_results, config)
 
     except FileNotFoundError as e:
         logger.error(f"Metadata error: {str(e)}")
@@ -135,6 +214,6 @@ async def search(domain: str, query: str, limit: int = 20) -> SearchResponse:
         )
 
 @app.get("/proxy")
-async def proxy(url: str):
+async def proxy(url: str, request: Request):
     """Proxy endpoint to handle X-Frame-Options."""
-    return await proxy_request(url)
+    return await proxy_request(url, request.headers.get("accept-encoding", "identity"))
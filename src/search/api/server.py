@@ -12,12 +12,18 @@ def run_server(host: str = None, port: int = None):
     config = load_config()
     api_config = config.get("api", {})
 
+    # Auto-reload runs a single watched process, so only use it in dev mode
+    dev_mode = api_config.get("dev_mode", False)
+
     uvicorn.run(
         "search.api.search:app",
         host=host or api_config.get("host", "0.0.0.0"),
         port=port or api_config.get("port", 8080),
         workers=api_config.get("workers", 4),
-        reload=True
+        loop="uvloop",
+        http="httptools",
+        reload=dev_mode,
+        access_log=dev_mode
     )
 
 if __name__ == "__main__":
@@ -141,7 +141,7 @@ def pages(url, data_dir, proxy_service, proxy_api_key):
     - {data_dir}/{domain}/sitemap_metadata.json: Basic URL metadata from sitemap
 
     Output files:
-    - {data_dir}/{domain}/pages_metadata.json: Detailed page metadata with crawl status
+    - {data_dir}/{domain}/pages_metadata.jsonl: Detailed page metadata with crawl status
     - {data_dir}/{domain}/pages_stats.json: Page crawl statistics
     - Saves HTML content to paths specified in metadata
     """
@@ -178,15 +178,15 @@ def pages(url, data_dir, proxy_service, proxy_api_key):
 @cli.command()
 @click.argument('url')
 @click.argument('data_dir', type=click.Path(), default=None, required=False)
-@click.option('--workers', type=int, help='Number of worker threads')
+@click.option('--workers', type=int, help='Maximum number of pages processed concurrently')
 def process(url, data_dir, workers):
     """Process crawled pages and extract text content.
 
     URL: The website URL to process
-    DATA_DIR: Directory (+domain subdir) to read pages_metadata.json (default from config)
+    DATA_DIR: Directory (+domain subdir) to read pages_metadata.jsonl (default from config)
 
     Input files:
-    - {data_dir}/{domain}/pages_metadata.json: Page metadata from crawler
+    - {data_dir}/{domain}/pages_metadata.jsonl: Page metadata from crawler
 
     Output files:
     - {data_dir}/{domain}/docs_metadata.json: Document metadata with extracted content
@@ -197,9 +197,9 @@ def process(url, data_dir, workers):
     site_dir = os.path.join(data_dir, domain)
 
     # Check for required input file
-    if not os.path.exists(os.path.join(site_dir, 'pages_metadata.json')):
+    if not os.path.exists(os.path.join(site_dir, 'pages_metadata.jsonl')):
         raise click.BadParameter(
-            f'pages_metadata.json not found in {site_dir}. Run pages command first.'
+            f'pages_metadata.jsonl not found in {site_dir}. Run pages command first.'
         )
 
     # Setup logging
@@ -221,7 +221,8 @@ def process(url, data_dir, workers):
 @click.argument('url')
 @click.argument('data_dir', type=click.Path(), default=None, required=False)
 @click.option('--batch-size', type=int, help='Override batch size from config')
-def index(url, data_dir, batch_size):
+@click.option('--concurrency', type=int, help='Override parallel bulk requests from config')
+def index(url, data_dir, batch_size, concurrency):
     """Index processed documents in Elasticsearch.
 
     URL: The website URL to index
@@ -253,7 +254,8 @@ def index(url, data_dir, batch_size):
         logger.info("Starting document indexer")
         stats = index_documents(
             site_dir=site_dir,
-            batch_size=batch_size
+            batch_size=batch_size,
+            concurrency=concurrency
         )
         logger.info("Document indexing completed successfully!")
         logger.info(f"Indexed {stats['successful']} documents")
@@ -269,7 +271,7 @@ def index(url, data_dir, batch_size):
 @cli.command()
 @click.argument('url')
 @click.argument('data_dir', type=click.Path(), default=None, required=False)
-@click.option('--workers', type=int, help='Number of worker threads')
+@click.option('--workers', type=int, help='Maximum number of pages processed concurrently')
 def products(url, data_dir, workers):
     """Process product pages and extract specifications.
 
@@ -316,7 +318,7 @@ def products(url, data_dir, workers):
 @cli.command()
 @click.argument('url')
 @click.argument('data_dir', type=click.Path(), default=None, required=False)
-@click.option('--workers', type=int, help='Number of worker threads')
+@click.option('--workers', type=int, help='Maximum number of pages processed concurrently')
 def qa(url, data_dir, workers):
     """Generate Q&A pairs for processed documents.
 
@@ -360,7 +362,8 @@ def qa(url, data_dir, workers):
 @click.argument('url')
 @click.argument('data_dir', type=click.Path(), default=None, required=False)
 @click.option('--batch-size', type=int, help='Override batch size from config')
-def index_qa(url, data_dir, batch_size):
+@click.option('--concurrency', type=int, help='Override parallel bulk requests from config')
+def index_qa(url, data_dir, batch_size, concurrency):
     """Index Q&A pairs in Elasticsearch.
 
     URL: The website URL to index
@@ -392,7 +395,8 @@ def index_qa(url, data_dir, batch_size):
         logger.info("Starting Q&A indexer")
         stats = index_question_and_answer(
             site_dir=site_dir,
-            batch_size=batch_size
+            batch_size=batch_size,
+            concurrency=concurrency
         )
         logger.info("Q&A indexing completed successfully!")
         logger.info(f"Indexed {stats['successful']} documents")
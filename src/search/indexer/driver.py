@@ -1,10 +1,14 @@
 """Driver for document indexing."""
 import os
-import json
+import queue
 import logging
-import tiktoken
+import threading
+import orjson
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Callable
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Set, Tuple
 from ..utils.config import load_config
 from ..utils.storage import load_metadata, save_stats
 from ..utils.embeddings import EmbeddingsGenerator
@@ -13,18 +17,51 @@ from ..utils.text_chunker import TextChunker
 
 logger = logging.getLogger(__name__)
 
-def _prepare_content_documents(site_dir: str, sitemap_metadata: Dict[str, Any], docs_metadata: Dict[str, Any], chunker: TextChunker) -> List[Dict[str, Any]]:
-    """Prepare regular content documents for indexing."""
-    documents = []
-    for url, metadata in docs_metadata.items():
-        content_path = os.path.join(site_dir, metadata['local_file'])
-        try:
-            with open(content_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            chunks = chunker.chunk_text(content)
+# Concurrent content file reads while preparing documents
+READ_WORKERS = 16
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+def _read_ahead(paths: Iterable[str], max_workers: int = READ_WORKERS) -> Iterator[Tuple[str, Future]]:
+    """Read files on a thread pool, yielding (path, future) in input order.
+
+    At most 2 * max_workers reads are in flight or waiting to be consumed,
+    so concurrent I/O doesn't load the whole site into memory.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        window = deque()
+        for path in paths:
+            window.append((path, executor.submit(_read_text, path)))
+            if len(window) >= 2 * max_workers:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+def _prepare_content_documents(site_dir: str, sitemap_metadata: Dict[str, Any], docs_metadata: Dict[str, Any], chunker: TextChunker,
+                               stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Prepare regular content documents for indexing, one at a time.
 
-            # Use page_type from metadata as chunk_type, default to 'doc' if not present
-            chunk_type = metadata.get('page_type', sitemap_metadata.get(url, {}).get('page_type', 'document'))
+    Files that can't be read or chunked are skipped and counted in
+    stats['read_failures'].
+    """
+    # Use page_type from metadata as chunk_type, falling back to the sitemap, then 'document'
+    chunk_types = {
+        url: metadata.get('page_type', sitemap_metadata.get(url, {}).get('page_type', 'document'))
+        for url, metadata in docs_metadata.items()
+    }
+
+    # local_file is always relative to site_dir, so plain concatenation
+    # matches os.path.join without a function call per document
+    prefix = os.path.join(site_dir, '')
+    items = list(docs_metadata.items())
+    paths = (prefix + metadata['local_file'] for _, metadata in items)
+    for (url, metadata), (content_path, content) in zip(items, _read_ahead(paths)):
+        try:
+            chunks = chunker.chunk_text(content.result())
+            chunk_type = chunk_types[url]
 
             doc = {
                 'url': url,
@@ -35,25 +72,53 @@ def _prepare_content_documents(site_dir: str, sitemap_metadata: Dict[str, Any],
                     'metadata': None
                 } for chunk in chunks]
             }
-            documents.append(doc)
         except Exception as e:
-            logger.error(f"Failed to read content file {content_path}: {str(e)}")
+            stats['read_failures'] += 1
+            logger.error("Failed to read content file %s: %s", content_path, e)
             continue
-    return documents
+        yield doc
 
-def _prepare_qa_documents(site_dir: str, sitemap_metadata: Dict[str, Any], docs_metadata: Dict[str, Any], chunker: TextChunker) -> List[Dict[str, Any]]:
-    """Prepare QA documents for indexing."""
-    documents = []
-    for url, metadata in docs_metadata.items():
-        content_path = os.path.join(site_dir, metadata['local_file'])
-        qa_path = f"{content_path}.qa.json"
+def _existing_qa_files(qa_paths: Iterable[str]) -> Set[str]:
+    """Find which of the given QA file paths exist.
 
-        if not os.path.exists(qa_path):
+    Each directory is listed once with os.scandir instead of calling
+    os.path.exists per document, which matters on network storage.
+    """
+    existing = set()
+    for directory in {os.path.dirname(path) for path in qa_paths}:
+        try:
+            with os.scandir(directory) as entries:
+                existing.update(
+                    os.path.join(directory, entry.name)
+                    for entry in entries
+                    if entry.name.endswith('.qa.json')
+                )
+        except (FileNotFoundError, NotADirectoryError):
             continue
+    return existing
+
+def _prepare_qa_documents(site_dir: str, sitemap_metadata: Dict[str, Any], docs_metadata: Dict[str, Any], chunker: TextChunker,
+                          stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Prepare QA documents for indexing, one at a time.
+
+    QA files that can't be read or parsed are skipped and counted in
+    stats['read_failures'].
+    """
+    prefix = os.path.join(site_dir, '')
+    qa_path_to_url = {
+        prefix + metadata['local_file'] + '.qa.json': url
+        for url, metadata in docs_metadata.items()
+    }
+    existing = _existing_qa_files(qa_path_to_url)
+
+    # Visit only the QA files that exist, mapped back to their document URL
+    for qa_path in sorted(existing.intersection(qa_path_to_url)):
+        url = qa_path_to_url[qa_path]
+        metadata = docs_metadata[url]
 
         try:
-            with open(qa_path, 'r', encoding='utf-8') as f:
-                qa_pairs = json.load(f)
+            with open(qa_path, 'rb') as f:
+                qa_pairs = orjson.loads(f.read())
 
             doc = {
                 'url': url,
@@ -64,19 +129,79 @@ def _prepare_qa_documents(site_dir: str, sitemap_metadata: Dict[str, Any], docs_
                     'metadata': {'answer': qa['answer']}
                 } for qa in qa_pairs]
             }
-            if doc['chunks']:  # Only add document if it has chunks
-                documents.append(doc)
         except Exception as e:
-            logger.error(f"Failed to process QA file {qa_path}: {str(e)}")
+            stats['read_failures'] += 1
+            logger.error("Failed to process QA file %s: %s", qa_path, e)
             continue
-    return documents
+        if doc['chunks']:  # Only add document if it has chunks
+            yield doc
+
+class _ProducerError:
+    """Wraps an exception raised by the prefetch thread."""
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def _prefetch(items: Iterable[Dict[str, Any]], maxsize: int) -> Iterator[Dict[str, Any]]:
+    """Iterate items produced by a background thread through a bounded queue.
+
+    The thread runs ahead of the consumer by at most maxsize items, so
+    document preparation overlaps indexing while memory stays bounded. An
+    exception in the producer is re-raised in the consumer, and the producer
+    stops when the consumer does.
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_ProducerError(e))
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, name="index-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+def _batched(items: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group items into lists of at most batch_size."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
 
 def _run_indexing(
     site_dir: str,
-    prepare_documents: Callable[[str, Dict[str, Any], TextChunker], List[Dict[str, Any]]],
+    prepare_documents: Callable[[str, Dict[str, Any], Dict[str, Any], TextChunker, Dict[str, Any]], Iterator[Dict[str, Any]]],
     metadata_file: str,
     stats_file: str,
-    batch_size: Optional[int] = None
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None
 ) -> Dict[str, Any]:
     """Common indexing logic for different document types."""
     logger.info(f"Starting document indexing for: {site_dir}")
@@ -87,6 +212,8 @@ def _run_indexing(
     config = load_config(domain)
     if not batch_size:
         batch_size = config["indexer"]["batch_size"]
+    if not concurrency:
+        concurrency = config["indexer"].get("concurrency")
 
     # Load document metadata
     metadata_path = os.path.join(site_dir, metadata_file)
@@ -106,6 +233,7 @@ def _run_indexing(
         'total_documents': len(docs_metadata),
         'successful': 0,
         'failed': [],
+        'read_failures': 0,
         'start_time': datetime.now().isoformat(),
         'end_time': None,
         'duration_seconds': None
@@ -114,22 +242,36 @@ def _run_indexing(
     try:
         # Initialize embeddings generator and indexer
         embeddings = EmbeddingsGenerator()
-        indexer = DocumentIndexer(domain=domain, embeddings=embeddings)
+        indexer = DocumentIndexer(domain=domain, embeddings=embeddings, concurrency=concurrency)
         chunker = TextChunker(
             sentence_splitters=config["indexer"]["sentence_splitters"],
             max_tokens=config["elasticsearch"]["chunk_size"]
         )
 
-        # Prepare all documents
-        documents = prepare_documents(site_dir, sitemap_metadata, docs_metadata, chunker)
+        # Prepare documents in the background while earlier batches are indexed
+        documents = _prefetch(
+            prepare_documents(site_dir, sitemap_metadata, docs_metadata, chunker, stats),
+            maxsize=2 * batch_size
+        )
 
-        # Process documents in batches
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            results = indexer.index_batch_with_chunks(batch)
+        def record(results: Dict[str, Any]):
             stats['successful'] += results['success']
             stats['failed'].extend(results['failed'])
 
+        # Process documents in batches; refreshes are paused until all are written.
+        # Each batch is bulk-indexed on a background thread while the next one is
+        # embedded, so a batch costs max(embed, index) rather than their sum.
+        with indexer.bulk_load(), ThreadPoolExecutor(max_workers=1) as bulk_executor:
+            pending = None
+            for batch in _batched(documents, batch_size):
+                actions, failed = indexer.prepare_batch(batch)
+                stats['failed'].extend(failed)
+                if pending:
+                    record(pending.result())
+                pending = bulk_executor.submit(indexer.index_actions, actions)
+            if pending:
+                record(pending.result())
+
     except Exception as e:
         logger.error(f"Indexing error: {str(e)}", exc_info=True)
         raise
@@ -147,15 +289,19 @@ def _run_indexing(
         save_stats(stats, stats_path)
 
         logger.info(f"Indexing completed. Success: {stats['successful']}, Failed: {len(stats['failed'])}")
+        if stats['read_failures']:
+            logger.warning(f"Skipped {stats['read_failures']} documents whose files could not be read")
 
     return stats
 
-def index_documents(site_dir: str, batch_size: Optional[int] = None) -> Dict[str, Any]:
+def index_documents(site_dir: str, batch_size: Optional[int] = None,
+                    concurrency: Optional[int] = None) -> Dict[str, Any]:
     """Index processed documents in Elasticsearch.
 
     Args:
         site_dir: Directory containing processed documents
         batch_size: Optional override for batch size from config
+        concurrency: Optional override for parallel bulk requests from config
 
     Returns:
         Dict containing indexing statistics
@@ -166,15 +312,18 @@ def index_documents(site_dir: str, batch_size: Optional[int] = None) -> Dict[str
         prepare_documents=_prepare_content_documents,
         metadata_file='docs_metadata.json',
         stats_file='index_stats.json',
-        batch_size=batch_size
+        batch_size=batch_size,
+        concurrency=concurrency
     )
 
-def index_question_and_answer(site_dir: str, batch_size: Optional[int] = None) -> Dict[str, Any]:
+def index_question_and_answer(site_dir: str, batch_size: Optional[int] = None,
+                              concurrency: Optional[int] = None) -> Dict[str, Any]:
     """Index Q&A pairs in Elasticsearch.
 
     Args:
         site_dir: Directory containing processed documents
         batch_size: Optional override for batch size from config
+        concurrency: Optional override for parallel bulk requests from config
 
     Returns:
         Dict containing indexing statistics
@@ -185,5 +334,6 @@ def index_question_and_answer(site_dir: str, batch_size: Optional[int] = None) -
         prepare_documents=_prepare_qa_documents,
         metadata_file='docs_metadata.json',
         stats_file='qa_index_stats.json',
-        batch_size=batch_size
+        batch_size=batch_size,
+        concurrency=concurrency
     )
\ No newline at end of file
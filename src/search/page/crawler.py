@@ -1,11 +1,14 @@
 """Page crawler implementation."""
 import os
+import time
+import hashlib
 import logging
 from datetime import datetime
+import orjson
 from scrapy import Spider
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
-from ..utils.storage import load_metadata, save_metadata, save_stats
+from ..utils.storage import load_metadata, save_stats
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +22,20 @@ class WebsitePageSpider(Spider):
         # Initialize paths
         self.site_dir = site_dir
         self.sitemap_metadata_file = os.path.join(site_dir, 'sitemap_metadata.json')
-        self.pages_metadata_file = os.path.join(site_dir, 'pages_metadata.json')
+        self.pages_metadata_file = os.path.join(site_dir, 'pages_metadata.jsonl')
         self.pages_stats_file = os.path.join(site_dir, 'pages_stats.json')
 
-        # Load sitemap metadata and initialize pages metadata
+        # Output directories already created, so makedirs runs once per directory
+        self._created_dirs = set()
+
+        # Load sitemap metadata
         self.sitemap_metadata = load_metadata(self.sitemap_metadata_file)
-        self.pages_metadata = {}
         self.start_urls = list(self.sitemap_metadata.keys())
 
+        # Pages metadata is streamed as one JSON line per page, so memory stays
+        # flat and a killed crawl keeps what it had fetched
+        self._pages_metadata_fp = open(self.pages_metadata_file, 'wb', buffering=1 << 17)
+
         # Initialize stats
         self.stats = {
             'total_crawled': 0,
@@ -38,6 +47,12 @@ class WebsitePageSpider(Spider):
             'end_time': None,
             'duration_seconds': None
         }
+        # Monotonic start for the duration; start_time is for display only
+        self._t0 = time.monotonic()
+
+    def _write_page_metadata(self, url, page_meta):
+        """Append one page's metadata to the JSON Lines file."""
+        self._pages_metadata_fp.write(orjson.dumps({url: page_meta}) + b'\n')
 
     def parse(self, response):
         """Process each downloaded page."""
@@ -45,43 +60,54 @@ class WebsitePageSpider(Spider):
         original_url = response.request.url
         sitemap_meta = self.sitemap_metadata[original_url]
 
+        # Unix timestamp keeps the per-page metadata small and cheap to produce
+        now = int(time.time())
+
         try:
             # Create directory if needed
             output_path = os.path.join(self.site_dir, sitemap_meta['local_file'])
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            output_dir = os.path.dirname(output_path)
+            if output_dir not in self._created_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+                self._created_dirs.add(output_dir)
 
-            # Save the page content
-            with open(output_path, 'wb') as f:
-                f.write(response.body)
+            # Save the page content in a single write through a 128 KiB buffer
+            body = response.body
+            with open(output_path, 'wb', buffering=1 << 17) as f:
+                f.write(body)
+            content_size = len(body)
 
             # Create page metadata
-            self.pages_metadata[original_url] = {
+            page_meta = {
                 'local_file': sitemap_meta['local_file'],
                 'page_type': sitemap_meta['page_type'],
                 'title': sitemap_meta.get('title', ''),
                 'crawl_status': 'success',
-                'crawl_timestamp': datetime.now().isoformat(),
-                'content_size': len(response.body),
+                'crawl_timestamp': now,
+                'content_size': content_size,
+                # Lets document processing skip pages whose content is unchanged
+                'content_sha256': hashlib.sha256(body).hexdigest(),
                 'error_messages': []
             }
 
             # Add redirected URL if different
             if response.url != original_url:
-                self.pages_metadata[original_url]['redirected_url'] = response.url
+                page_meta['redirected_url'] = response.url
+            self._write_page_metadata(original_url, page_meta)
 
             # Update stats
             self.stats['successful'] += 1
-            self.stats['total_bytes'] += len(response.body)
+            self.stats['total_bytes'] += content_size
 
         except Exception as e:
             logger.error(f"Failed to save {original_url}: {str(e)}")
-            self.pages_metadata[original_url] = {
+            self._write_page_metadata(original_url, {
                 'local_file': sitemap_meta['local_file'],
                 'page_type': sitemap_meta['page_type'],
                 'crawl_status': 'failed',
-                'crawl_timestamp': datetime.now().isoformat(),
+                'crawl_timestamp': now,
                 'error_messages': [str(e)]
-            }
+            })
             self.stats['failed'] += 1
 
         finally:
@@ -91,18 +117,15 @@ class WebsitePageSpider(Spider):
         """Save metadata and stats when spider closes."""
         # Update final stats
         self.stats['end_time'] = datetime.now().isoformat()
-        self.stats['duration_seconds'] = (
-            datetime.fromisoformat(self.stats['end_time']) -
-            datetime.fromisoformat(self.stats['start_time'])
-        ).total_seconds()
+        self.stats['duration_seconds'] = time.monotonic() - self._t0
 
         logger.info(f"Spider closing. Reason: {reason}")
         logger.info(f"Crawled {self.stats['total_crawled']} pages")
         logger.info(f"Success: {self.stats['successful']}")
         logger.info(f"Failed: {self.stats['failed']}")
 
-        # Save pages metadata and stats
-        save_metadata(self.pages_metadata, self.pages_metadata_file)
+        # Flush pages metadata and save stats
+        self._pages_metadata_fp.close()
         save_stats(self.stats, self.pages_stats_file)
 
 
@@ -1,17 +1,17 @@
 """Document processor implementation."""
 import os
+import asyncio
 import logging
-import json
+import orjson
 import re
-from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List
-from .html import process_html
+from tqdm.asyncio import tqdm
+from typing import Dict, Any, List, Tuple
+from .html import process_html, process_html_async
 from .pdf import process_pdf
-from ..utils.storage import load_metadata, save_metadata, save_stats
-from ..utils.llm_chat import ChatCompletionGenerator
+from ..utils.storage import load_metadata, load_metadata_jsonl, save_metadata, save_stats
+from ..utils.llm_chat import ChatCompletionGenerator, DEFAULT_CONCURRENCY
 from ..utils.config import load_config
-from .qa import generate_qa_pairs
+from .qa import generate_qa_pairs_batch_async, QA_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +31,6 @@ def process_document(file_path: str, chat: ChatCompletionGenerator = None) -> Di
         ValueError: If file type is not supported
         FileNotFoundError: If file doesn't exist
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-
     # Get file extension
     _, ext = os.path.splitext(file_path)
     ext = ext.lower()
@@ -44,12 +41,36 @@ def process_document(file_path: str, chat: ChatCompletionGenerator = None) -> Di
     else:
         return process_html(file_path, chat)  # Pass chat to HTML processor
 
+async def process_document_async(file_path: str, chat: ChatCompletionGenerator = None) -> Dict[str, Any]:
+    """Process a document file, running parsing in a worker thread.
+
+    Args:
+        file_path: Path to the document file (HTML or PDF)
+        chat: Optional ChatCompletionGenerator for content rewriting
+
+    Returns:
+        dict: Same fields as process_document
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    # Get file extension
+    _, ext = os.path.splitext(file_path)
+    ext = ext.lower()
+
+    # Select appropriate processor
+    if ext == '.pdf':
+        return await asyncio.to_thread(process_pdf, file_path)
+    else:
+        return await process_html_async(file_path, chat)
+
 def process_site(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
     """Process all documents in a site directory.
 
     Args:
         site_dir: Directory containing site data
-        max_workers: Maximum number of worker threads
+        max_workers: Maximum number of pages processed concurrently
+            (default: DEFAULT_CONCURRENCY)
 
     Returns:
         dict: Processing statistics
@@ -57,7 +78,7 @@ def process_site(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
     logger.info(f"Starting document processing for: {site_dir}")
 
     # Initialize paths
-    pages_metadata_file = os.path.join(site_dir, 'pages_metadata.json')
+    pages_metadata_file = os.path.join(site_dir, 'pages_metadata.jsonl')
     docs_metadata_file = os.path.join(site_dir, 'docs_metadata.json')
     docs_stats_file = os.path.join(site_dir, 'docs_stats.json')
     docs_dir = os.path.join(site_dir, 'docs')
@@ -67,84 +88,104 @@ def process_site(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
         'total_processed': 0,
         'successful': 0,
         'failed': 0,
+        'unchanged': 0,
         'total_bytes': 0
     }
 
     # Load pages metadata
-    pages_metadata = load_metadata(pages_metadata_file)
+    pages_metadata = load_metadata_jsonl(pages_metadata_file)
     logger.info(f"Found {len(pages_metadata)} pages to process")
 
+    # Documents from the previous run, reused for pages whose content is unchanged
+    previous_docs = load_metadata(docs_metadata_file) if os.path.exists(docs_metadata_file) else {}
+
     # Initialize docs metadata
     docs_metadata = {}
 
-    def process_page(chat: ChatCompletionGenerator, url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # Output directories already created, so makedirs runs once per directory.
+    # Pages are processed on one event loop thread, so no lock is needed.
+    created_dirs = set()
+
+    async def process_page(sem: asyncio.Semaphore, chat: ChatCompletionGenerator,
+                           url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single page."""
-        try:
-            # Skip failed pages
-            if metadata.get('crawl_status') != 'success':
-                logger.warning(f"Skipping failed page: {url}")
-                return None
+        async with sem:
+            try:
+                # Skip failed pages
+                if metadata.get('crawl_status') != 'success':
+                    logger.warning(f"Skipping failed page: {url}")
+                    return None
+
+                # Reuse the previous document if the crawled content is unchanged
+                content_sha256 = metadata.get('content_sha256')
+                previous = previous_docs.get(url)
+                if (content_sha256 and previous
+                        and previous.get('content_sha256') == content_sha256
+                        and os.path.exists(os.path.join(site_dir, previous['local_file']))):
+                    logger.debug(f"Content unchanged, reusing document: {url}")
+                    stats['unchanged'] += 1
+                    return {**previous, 'page_type': metadata.get('page_type', 'doc')}
+
+                # Process the document
+                input_file = os.path.join(site_dir, metadata['local_file'])
+                doc_data = await process_document_async(input_file, chat)
+
+                # Create output path
+                rel_path = os.path.relpath(metadata['local_file'], 'html')
+                base_path = os.path.splitext(rel_path)[0]
+                output_path = os.path.join(docs_dir, f"{base_path}.txt")
+                output_dir = os.path.dirname(output_path)
+                if output_dir not in created_dirs:
+                    os.makedirs(output_dir, exist_ok=True)
+                    created_dirs.add(output_dir)
+
+                # Save processed content
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(doc_data['content'])
+                    logger.info(f"Processed content saved to: {output_path}")
+
+                if 'reduced' in doc_data:
+                    reduced_path = f"{input_file}.reduced"
+                    with open(reduced_path, 'w', encoding='utf-8') as f:
+                        f.write(doc_data['reduced'])
+
+                # Update stats
+                stats['successful'] += 1
+                stats['total_bytes'] += len(doc_data['content'])
 
-            # Process the document
-            input_file = os.path.join(site_dir, metadata['local_file'])
-            doc_data = process_document(input_file, chat)
-
-            # Create output path
-            rel_path = os.path.relpath(metadata['local_file'], 'html')
-            base_path = os.path.splitext(rel_path)[0]
-            output_path = os.path.join(docs_dir, f"{base_path}.txt")
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            # Save processed content
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(doc_data['content'])
-                logger.info(f"Processed content saved to: {output_path}")
-
-            if 'reduced' in doc_data:
-                reduced_path = f"{input_file}.reduced"
-                with open(reduced_path, 'w', encoding='utf-8') as f:
-                    f.write(doc_data['reduced'])
-
-            # Update stats
-            stats['successful'] += 1
-            stats['total_bytes'] += len(doc_data['content'])
-
-            # Return document metadata
-            return {
-                'title': doc_data['title'],
-                'local_file': os.path.relpath(output_path, site_dir),
-                'page_type': metadata.get('page_type', 'doc')  # Copy page_type from pages_metadata
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to process {url}: {str(e)}")
-            stats['failed'] += 1
-            return None
+                # Return document metadata
+                return {
+                    'title': doc_data['title'],
+                    'local_file': os.path.relpath(output_path, site_dir),
+                    'page_type': metadata.get('page_type', 'doc'),  # Copy page_type from pages_metadata
+                    'content_sha256': content_sha256
+                }
 
-        finally:
-            stats['total_processed'] += 1
+            except Exception as e:
+                logger.error(f"Failed to process {url}: {str(e)}")
+                stats['failed'] += 1
+                return None
+
+            finally:
+                stats['total_processed'] += 1
 
-    # Process pages in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Create a ChatCompletionGenerator instance
+    async def run() -> List[Dict[str, Any]]:
+        # One event loop multiplexes all LLM requests; the semaphore bounds
+        # how many pages are in flight
         chat = ChatCompletionGenerator()
+        sem = asyncio.Semaphore(max_workers or DEFAULT_CONCURRENCY)
+        try:
+            return await tqdm.gather(
+                *(process_page(sem, chat, url, meta) for url, meta in pages_metadata.items()),
+                desc="Processing pages"
+            )
+        finally:
+            await chat.async_client.close()
 
-        # Submit all pages for processing
-        future_to_url = {
-            executor.submit(process_page, chat, url, meta): url
-            for url, meta in pages_metadata.items()
-        }
-
-        # Collect results as they complete
-        for future in tqdm(as_completed(future_to_url), total=len(future_to_url), desc="Processing pages"):
-            url = future_to_url[future]
-            try:
-                doc_meta = future.result()
-                if doc_meta:
-                    docs_metadata[url] = doc_meta
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}")
-                stats['failed'] += 1
+    # Process pages concurrently
+    for url, doc_meta in zip(pages_metadata, asyncio.run(run())):
+        if doc_meta:
+            docs_metadata[url] = doc_meta
 
     # Save docs metadata and stats
     save_metadata(docs_metadata, docs_metadata_file)
@@ -153,6 +194,7 @@ def process_site(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
     logger.info(f"Total processed: {stats['total_processed']}")
     logger.info(f"Successful: {stats['successful']}")
     logger.info(f"Failed: {stats['failed']}")
+    logger.info(f"Unchanged: {stats['unchanged']}")
 
     return stats
 
@@ -161,7 +203,8 @@ def generate_qa(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
 
     Args:
         site_dir: Directory containing site data
-        max_workers: Maximum number of worker threads
+        max_workers: Maximum number of batched Q&A requests in flight
+            (default: DEFAULT_CONCURRENCY)
 
     Returns:
         dict: Generation statistics
@@ -191,73 +234,84 @@ def generate_qa(site_dir: str, max_workers: int = None) -> Dict[str, Any]:
 
     logger.info(f"URL patterns: {url_patterns}")
 
+    # Fuse the patterns into one alternation so each URL is scanned once
     if url_patterns:
-        url_regexes = [re.compile(pattern) for pattern in url_patterns]
+        url_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in url_patterns))
     else:
         logger.info("No URL filters specified, processing all documents")
-        url_regexes = []
+        url_regex = None
 
     def should_process_url(url: str) -> bool:
         """Check if URL should be processed based on filters."""
-        if not url_regexes:
-            return True
-        return any(regex.search(url) for regex in url_regexes)
-
-    def process_doc(chat: ChatCompletionGenerator, url: str, metadata: Dict[str, Any]) -> bool:
-        """Process a single document."""
-        try:
-            # Check URL filter
-            if not should_process_url(url):
-                logger.debug(f"Skipping URL (filtered): {url}")
-                stats['filtered'] += 1
-                return False
+        return url_regex is None or url_regex.search(url) is not None
+
+    # Apply the URL filter up front so batches hold only documents to process
+    to_process = []
+    for url, meta in docs_metadata.items():
+        if should_process_url(url):
+            to_process.append((url, meta))
+        else:
+            logger.debug(f"Skipping URL (filtered): {url}")
+            stats['filtered'] += 1
+            stats['total_processed'] += 1
 
-            # Read document content
-            input_file = os.path.join(site_dir, metadata['local_file'])
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+    # Several documents share one LLM request
+    batch_size = config.get('document_processor', {}).get('qa_batch_size', QA_BATCH_SIZE)
+    batches = [to_process[i:i + batch_size] for i in range(0, len(to_process), batch_size)]
+
+    async def process_batch(sem: asyncio.Semaphore, chat: ChatCompletionGenerator,
+                            batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Generate and save Q&A pairs for a batch of documents."""
+        async with sem:
+            # Read document contents
+            docs = []
+            for url, metadata in batch:
+                input_file = os.path.join(site_dir, metadata['local_file'])
+                try:
+                    with open(input_file, 'r', encoding='utf-8') as f:
+                        docs.append((url, input_file, f.read()))
+                except Exception as e:
+                    logger.error(f"Failed to generate Q&A for {url}: {str(e)}")
+                    stats['failed'] += 1
+                    stats['total_processed'] += 1
+            if not docs:
+                return
 
             # Generate Q&A pairs
-            qa_pairs = generate_qa_pairs(chat, content)
-            if qa_pairs:
-                qa_path = f"{input_file}.qa.json"
-                with open(qa_path, 'w', encoding='utf-8') as f:
-                    json.dump(qa_pairs, f, indent=2)
-                    logger.info(f"Q&A pairs saved to: {qa_path}")
-                stats['successful'] += 1
-                return True
-
-            logger.warning(f"No Q&A pairs generated for: {url}")
-            stats['failed'] += 1
-            return False
-
-        except Exception as e:
-            logger.error(f"Failed to generate Q&A for {url}: {str(e)}")
-            stats['failed'] += 1
-            return False
-
-        finally:
-            stats['total_processed'] += 1
-
-    # Process documents in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Create a ChatCompletionGenerator instance
+            all_qa_pairs = await generate_qa_pairs_batch_async(chat, [content for _, _, content in docs])
+
+            for (url, input_file, _), qa_pairs in zip(docs, all_qa_pairs):
+                try:
+                    if qa_pairs:
+                        qa_path = f"{input_file}.qa.json"
+                        with open(qa_path, 'wb') as f:
+                            f.write(orjson.dumps(qa_pairs))
+                            logger.info(f"Q&A pairs saved to: {qa_path}")
+                        stats['successful'] += 1
+                    else:
+                        logger.warning(f"No Q&A pairs generated for: {url}")
+                        stats['failed'] += 1
+
+                except Exception as e:
+                    logger.error(f"Failed to generate Q&A for {url}: {str(e)}")
+                    stats['failed'] += 1
+
+                finally:
+                    stats['total_processed'] += 1
+
+    async def run() -> None:
         chat = ChatCompletionGenerator()
+        sem = asyncio.Semaphore(max_workers or DEFAULT_CONCURRENCY)
+        try:
+            await tqdm.gather(
+                *(process_batch(sem, chat, batch) for batch in batches),
+                desc="Generating Q&A"
+            )
+        finally:
+            await chat.async_client.close()
 
-        # Submit all documents for processing
-        future_to_url = {
-            executor.submit(process_doc, chat, url, meta): url
-            for url, meta in docs_metadata.items()
-        }
-
-        # Process results as they complete
-        for future in tqdm(as_completed(future_to_url), total=len(future_to_url), desc="Generating Q&A"):
-            url = future_to_url[future]
-            try:
-                future.result()
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}")
-                stats['failed'] += 1
+    # Process documents concurrently
+    asyncio.run(run())
 
     # Save stats
     save_stats(stats, qa_stats_file)
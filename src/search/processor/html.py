@@ -1,12 +1,28 @@
 """HTML document processor."""
+import asyncio
 import logging
 from typing import Dict, Any
-from bs4 import BeautifulSoup
-import re
+import lxml.html
+from lxml import etree
 from ..utils.llm_chat import ChatCompletionGenerator
 
 logger = logging.getLogger(__name__)
 
+# Pages are saved as UTF-8; the parser is reusable across documents. Nothing
+# looks elements up by ID, so the parser skips building the ID table
+_PARSER = lxml.html.HTMLParser(encoding='utf-8', collect_ids=False)
+
+# Elements dropped before extracting content
+_UNWANTED_TAGS = ('script', 'style', 'nav', 'header', 'footer')
+
+# Main content candidates in one traversal, in document order
+_MAIN_XPATH = etree.XPath('//main | //article | //div[@id="content"]')
+_MAIN_PRIORITY = {'main': 0, 'article': 1, 'div': 2}
+
+# Shorter extracted text (error pages, stubs) is kept as is rather than sent
+# to the LLM for rewriting
+MIN_REWRITE_CHARS = 50
+
 def clean_text(text: str) -> str:
     """Clean extracted text content.
 
@@ -16,11 +32,30 @@ def clean_text(text: str) -> str:
     Returns:
         str: Cleaned text with normalized whitespace
     """
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Remove leading/trailing whitespace
-    text = text.strip()
-    return text
+    # Collapse runs of whitespace (including line breaks) and trim the ends;
+    # split() with no argument does both in C, faster than a regex
+    return ' '.join(text.split())
+
+# System prompt for content rewriting (part of the chat cache key, keep verbatim)
+REWRITE_SYSTEM_PROMPT = """You are a content editor. Your task is to rewrite the given text into clear,
+    human-readable content while preserving all important information. Focus on:
+    1. Maintaining factual accuracy
+    2. Improving readability and flow
+    3. Using natural language
+    4. Keeping the original meaning
+    5. Removing redundant or marketing language
+
+    Return only the rewritten text, without any explanations or metadata."""
+
+def _find_main_content(tree):
+    """Return the first <main>, else <article>, else <div id="content">, or None."""
+    best = None
+    for node in _MAIN_XPATH(tree):
+        if best is None or _MAIN_PRIORITY[node.tag] < _MAIN_PRIORITY[best.tag]:
+            best = node
+            if node.tag == 'main':
+                break
+    return best
 
 def rewrite_content(chat: ChatCompletionGenerator, content: str) -> str:
     """Rewrite content into human-readable text using LLM.
@@ -32,19 +67,30 @@ def rewrite_content(chat: ChatCompletionGenerator, content: str) -> str:
     Returns:
         str: Human-readable text
     """
-    system_prompt = """You are a content editor. Your task is to rewrite the given text into clear,
-    human-readable content while preserving all important information. Focus on:
-    1. Maintaining factual accuracy
-    2. Improving readability and flow
-    3. Using natural language
-    4. Keeping the original meaning
-    5. Removing redundant or marketing language
+    try:
+        result = chat.generate_with_context(
+            system_prompt=REWRITE_SYSTEM_PROMPT,
+            user_message=content,
+            temperature=0.3  # Lower temperature for more consistent output
+        )
+        return clean_text(result)
+    except Exception as e:
+        logger.error(f"Failed to rewrite content: {str(e)}")
+        return content  # Return original content if rewriting fails
 
-    Return only the rewritten text, without any explanations or metadata."""
+async def rewrite_content_async(chat: ChatCompletionGenerator, content: str) -> str:
+    """Rewrite content into human-readable text using the async LLM client.
 
+    Args:
+        chat: ChatCompletionGenerator instance
+        content: Raw content extracted from HTML
+
+    Returns:
+        str: Human-readable text
+    """
     try:
-        result = chat.generate_with_context(
-            system_prompt=system_prompt,
+        result = await chat.generate_with_context_async(
+            system_prompt=REWRITE_SYSTEM_PROMPT,
             user_message=content,
             temperature=0.3  # Lower temperature for more consistent output
         )
@@ -53,68 +99,111 @@ def rewrite_content(chat: ChatCompletionGenerator, content: str) -> str:
         logger.error(f"Failed to rewrite content: {str(e)}")
         return content  # Return original content if rewriting fails
 
-def process_html(file_path: str, chat: ChatCompletionGenerator = None) -> Dict[str, Any]:
-    """Process HTML file and extract structured data.
+def extract_html(file_path: str) -> Dict[str, Any]:
+    """Parse HTML file and extract title, text and reduced HTML.
 
     Args:
         file_path: Path to HTML file
-        chat: Optional ChatCompletionGenerator for content rewriting
 
     Returns:
         dict: Extracted data with fields:
             - title: str, page title
-            - content: str, main text content (rewritten if chat provided)
-            - reduced: str, reduced HTML content
+            - content: str, main text content
+            - reduced: str, reduced HTML content; omitted when the page has
+              no main content or body to reduce to
 
     Raises:
         FileNotFoundError: If file doesn't exist
         ValueError: If HTML parsing fails
     """
     try:
-        # Read and parse HTML
-        with open(file_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
+        # Read and parse HTML once; lxml parses the raw bytes in C
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        if not raw.strip():
+            logger.warning(f"Empty HTML file: {file_path}")
+            return {'title': '', 'content': ''}
+        tree = lxml.html.document_fromstring(raw, parser=_PARSER)
 
         # Extract title
         title = ''
-        title_tag = soup.find('title')
-        if title_tag:
-            title = clean_text(title_tag.get_text())
+        title_tag = tree.find('.//title')
+        if title_tag is not None:
+            title = clean_text(title_tag.text_content())
 
-        # Remove unwanted elements
-        for element in soup.find_all(['script', 'style', 'nav', 'header', 'footer']):
-            element.decompose()
+        # Remove unwanted elements, keeping the text that follows them
+        etree.strip_elements(tree, *_UNWANTED_TAGS, with_tail=False)
 
         # Extract main content
-        reduced_html = ''
-        main_content = soup.find('main') or soup.find('article') or soup.find('div', {'id': 'content'})
-        if main_content:
-            reduced_html = str(main_content)
-        else:
+        main_content = _find_main_content(tree)
+        if main_content is None:
             # Fallback: get text from body
-            body = soup.find('body')
-            if body:
-                reduced_html = str(body)
-            else:
+            main_content = tree.find('body')
+            if main_content is None:
                 logger.warning(f"No main content or body found in {file_path}, using all text")
-                reduced_html = str(soup)
-
-        # Extract and clean text content
-        content = clean_text(BeautifulSoup(reduced_html, 'html.parser').get_text())
-
-        # Rewrite content if chat is provided
-        if content:
-            content = rewrite_content(chat, content)
+                main_content = tree
 
-        return {
+        # Extract and clean text content from the same tree
+        doc_data = {
             'title': title,
-            'content': content,
-            'reduced': reduced_html
+            'content': clean_text(main_content.text_content())
         }
 
+        # The whole document is no reduction of the page, so it isn't returned
+        if main_content is not tree:
+            doc_data['reduced'] = lxml.html.tostring(main_content, encoding='unicode')
+
+        return doc_data
+
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         raise
     except Exception as e:
         logger.error(f"Failed to process HTML file {file_path}: {str(e)}")
-        raise ValueError(f"HTML processing failed: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"HTML processing failed: {str(e)}")
+
+def process_html(file_path: str, chat: ChatCompletionGenerator = None) -> Dict[str, Any]:
+    """Process HTML file and extract structured data.
+
+    Args:
+        file_path: Path to HTML file
+        chat: Optional ChatCompletionGenerator for content rewriting
+
+    Returns:
+        dict: Extracted data with fields:
+            - title: str, page title
+            - content: str, main text content (rewritten if chat provided)
+            - reduced: str, reduced HTML content; omitted when the page has
+              no main content or body to reduce to
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If HTML parsing fails
+    """
+    doc_data = extract_html(file_path)
+
+    # Rewrite content if chat is provided and there is enough text to rewrite
+    if len(doc_data['content']) >= MIN_REWRITE_CHARS:
+        doc_data['content'] = rewrite_content(chat, doc_data['content'])
+    return doc_data
+
+async def process_html_async(file_path: str, chat: ChatCompletionGenerator = None) -> Dict[str, Any]:
+    """Process HTML file, parsing in a worker thread and rewriting asynchronously.
+
+    Args:
+        file_path: Path to HTML file
+        chat: Optional ChatCompletionGenerator for content rewriting
+
+    Returns:
+        dict: Same fields as process_html
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If HTML parsing fails
+    """
+    doc_data = await asyncio.to_thread(extract_html, file_path)
+
+    # Rewrite content if chat is provided and there is enough text to rewrite
+    if len(doc_data['content']) >= MIN_REWRITE_CHARS:
+        doc_data['content'] = await rewrite_content_async(chat, doc_data['content'])
+    return doc_data
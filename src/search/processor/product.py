@@ -1,19 +1,25 @@
 """Product page processor."""
 import os
+import asyncio
 import logging
 import json
-from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any
+import orjson
+from tqdm.asyncio import tqdm
+from typing import Dict, Any, List
 from urllib.parse import urlparse
 from ..utils.storage import load_metadata, save_metadata, save_stats
 from ..utils.config import load_config
-from ..utils.llm_chat import ChatCompletionGenerator
+from ..utils.llm_chat import ChatCompletionGenerator, DEFAULT_CONCURRENCY
 from ..utils.json_utils import load_json
 from ..utils.product_utils import get_product_handle
 
 logger = logging.getLogger(__name__)
 
+# Default cap on the reduced page HTML sent to the LLM per product, bounding
+# input tokens on unusually large pages. Raw pages are read whole: their first
+# bytes are mostly <head> scripts and styles, not the product body
+MAX_INPUT_BYTES = 32 * 1024
+
 def get_product_filename(url: str) -> str:
     """Extract filename from product URL.
 
@@ -26,12 +32,42 @@ def get_product_filename(url: str) -> str:
     """
     return f"{get_product_handle(url)}.json"
 
-def process_product(chat: ChatCompletionGenerator, html_path: str, system_prompt: str) -> Dict[str, Any]:
+def _read_product_html(html_path: str, max_input_bytes: int) -> str:
+    """Read the page HTML sent to the LLM, capped at max_input_bytes.
+
+    Args:
+        html_path: Path to HTML file
+        max_input_bytes: Maximum bytes to read, 0 for the whole file
+
+    Returns:
+        str: HTML content
+
+    Raises:
+        FileNotFoundError: If HTML file doesn't exist
+    """
+    with open(html_path, 'rb') as f:
+        raw = f.read(max_input_bytes) if max_input_bytes else f.read()
+    if max_input_bytes and len(raw) == max_input_bytes:
+        logger.warning(f"Product HTML truncated to {max_input_bytes} bytes: {html_path}")
+    # A cut may split a multi-byte character; drop the partial bytes
+    return raw.decode('utf-8', errors='ignore')
+
+def _parse_specs(result: str) -> Dict[str, Any]:
+    """Parse the LLM response as JSON."""
+    try:
+        return load_json(result)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse LLM response as JSON: {str(e)}")
+        raise
+
+def process_product(chat: ChatCompletionGenerator, html_path: str, system_prompt: str,
+                    max_input_bytes: int = 0) -> Dict[str, Any]:
     """Process a single product page using OpenAI.
 
     Args:
         html_path: Path to HTML file
         system_prompt: System prompt for specification extraction
+        max_input_bytes: Maximum bytes of HTML sent to the LLM, 0 for no limit
 
     Returns:
         dict: Extracted product specifications
@@ -39,9 +75,7 @@ def process_product(chat: ChatCompletionGenerator, html_path: str, system_prompt
     Raises:
         FileNotFoundError: If HTML file doesn't exist
     """
-    # Read HTML content
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    html_content = _read_product_html(html_path, max_input_bytes)
 
     # Extract specifications using cleaned HTML
     result = chat.generate_with_context(
@@ -49,14 +83,32 @@ def process_product(chat: ChatCompletionGenerator, html_path: str, system_prompt
         user_message=html_content,
         temperature=0.1  # Low temperature for consistent extraction
     )
+    return _parse_specs(result)
 
-    # Parse JSON response
-    try:
-        specs = load_json(result)
-        return specs
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse LLM response as JSON: {str(e)}")
-        raise
+async def process_product_async(chat: ChatCompletionGenerator, html_path: str, system_prompt: str,
+                                max_input_bytes: int = 0) -> Dict[str, Any]:
+    """Process a single product page using the async OpenAI client.
+
+    Args:
+        html_path: Path to HTML file
+        system_prompt: System prompt for specification extraction
+        max_input_bytes: Maximum bytes of HTML sent to the LLM, 0 for no limit
+
+    Returns:
+        dict: Extracted product specifications
+
+    Raises:
+        FileNotFoundError: If HTML file doesn't exist
+    """
+    html_content = _read_product_html(html_path, max_input_bytes)
+
+    # Extract specifications using cleaned HTML
+    result = await chat.generate_with_context_async(
+        system_prompt=system_prompt,
+        user_message=html_content,
+        temperature=0.1  # Low temperature for consistent extraction
+    )
+    return _parse_specs(result)
 
 def process_site(site_dir: str, domain: str, max_workers: int = None) -> Dict[str, Any]:
     """Process all product pages in a site.
@@ -64,7 +116,8 @@ def process_site(site_dir: str, domain: str, max_workers: int = None) -> Dict[st
     Args:
         site_dir: Directory containing site data
         domain: Domain name for loading config
-        max_workers: Maximum number of worker threads
+        max_workers: Maximum number of pages processed concurrently
+            (default: DEFAULT_CONCURRENCY)
 
     Returns:
         dict: Processing statistics
@@ -93,6 +146,7 @@ def process_site(site_dir: str, domain: str, max_workers: int = None) -> Dict[st
     system_prompt = config.get('product_processor', {}).get('system_prompt')
     if not system_prompt:
         raise ValueError("Product processor system prompt not found in config")
+    max_input_bytes = config['product_processor'].get('max_input_bytes', MAX_INPUT_BYTES)
 
     # Initialize stats
     stats = {
@@ -104,57 +158,58 @@ def process_site(site_dir: str, domain: str, max_workers: int = None) -> Dict[st
     # Initialize product metadata
     product_metadata = {}
 
-    def process_page(chat: ChatCompletionGenerator, url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    async def process_page(sem: asyncio.Semaphore, chat: ChatCompletionGenerator,
+                           url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single product page."""
-        try:
-            # Get HTML file path
-            html_file = os.path.join(site_dir, metadata['local_file'])
-            reduced_file = f"{html_file}.reduced"
-            if os.path.exists(reduced_file):
-                html_file = reduced_file
-
-            # Process the product
-            product_data = process_product(chat, html_file, system_prompt)
-
-            # Save product data
-            output_path = os.path.join(products_dir, get_product_filename(url))
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(product_data, f, indent=2)
-
-            # Update stats
-            stats['successful'] += 1
-
-            # Return metadata
-            return {
-                'local_file': os.path.relpath(output_path, site_dir)
-            }
+        async with sem:
+            try:
+                # Process the product, preferring the reduced HTML; opening it
+                # directly saves a separate existence check per page. Only the
+                # reduced HTML is capped; the raw page is sent whole
+                html_file = os.path.join(site_dir, metadata['local_file'])
+                try:
+                    product_data = await process_product_async(
+                        chat, f"{html_file}.reduced", system_prompt, max_input_bytes
+                    )
+                except FileNotFoundError:
+                    product_data = await process_product_async(chat, html_file, system_prompt)
+
+                # Save product data
+                output_path = os.path.join(products_dir, get_product_filename(url))
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(product_data))
+
+                # Update stats
+                stats['successful'] += 1
+
+                # Return metadata
+                return {
+                    'local_file': os.path.relpath(output_path, site_dir)
+                }
 
-        except Exception as e:
-            logger.error(f"Failed to process {url}: {str(e)}")
-            stats['failed'] += 1
-            return None
+            except Exception as e:
+                logger.error(f"Failed to process {url}: {str(e)}")
+                stats['failed'] += 1
+                return None
 
-        finally:
-            stats['total_processed'] += 1
+            finally:
+                stats['total_processed'] += 1
 
-    # Process pages in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    async def run() -> List[Dict[str, Any]]:
         chat = ChatCompletionGenerator()
+        sem = asyncio.Semaphore(max_workers or DEFAULT_CONCURRENCY)
+        try:
+            return await tqdm.gather(
+                *(process_page(sem, chat, url, meta) for url, meta in product_pages.items()),
+                desc="Processing pages"
+            )
+        finally:
+            await chat.async_client.close()
 
-        future_to_url = {
-            executor.submit(process_page, chat, url, meta): url
-            for url, meta in product_pages.items()
-        }
-
-        for future in tqdm(as_completed(future_to_url), total=len(future_to_url), desc="Processing pages"):
-            url = future_to_url[future]
-            try:
-                product_meta = future.result()
-                if product_meta:
-                    product_metadata[url] = product_meta
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}")
-                stats['failed'] += 1
+    # Process pages concurrently
+    for url, product_meta in zip(product_pages, asyncio.run(run())):
+        if product_meta:
+            product_metadata[url] = product_meta
 
     # Save metadata and stats
     save_metadata(product_metadata, product_metadata_file)
@@ -1,22 +1,13 @@
 """Question-Answer generator for web content."""
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List
 from ..utils.llm_chat import ChatCompletionGenerator
 from ..utils.json_utils import load_json
 
 logger = logging.getLogger(__name__)
 
-def generate_qa_pairs(chat: ChatCompletionGenerator, content: str) -> List[Dict[str, str]]:
-    """Generate question-answer pairs from content using LLM.
-
-    Args:
-        chat: ChatCompletionGenerator instance
-        content: Page content text
-
-    Returns:
-        list: List of Q&A dictionaries with 'question' and 'answer' keys
-    """
-    system_prompt = """You are a question-answer generator. Analyze the provided content and generate meaningful,
+# System prompt for Q&A generation (part of the chat cache key, keep verbatim)
+QA_SYSTEM_PROMPT = """You are a question-answer generator. Analyze the provided content and generate meaningful,
     non-repetitive questions and their corresponding factual answers based solely on the given content. Follow these rules:
 
     1. Only generate Q&A pairs for meaningful, informative content
@@ -30,26 +21,146 @@ def generate_qa_pairs(chat: ChatCompletionGenerator, content: str) -> List[Dict[
 
     Return the Q&A pairs as a JSON array of objects with 'question' and 'answer' fields."""
 
+# Documents sent per batched Q&A request
+QA_BATCH_SIZE = 8
+
+# System prompt for batched Q&A generation over several delimited documents
+QA_BATCH_SYSTEM_PROMPT = """You are a question-answer generator. You will receive several documents, each wrapped in
+    <document id="N"> tags. For each document independently, generate meaningful, non-repetitive questions and
+    their corresponding factual answers based solely on that document. Follow these rules:
+
+    1. Only generate Q&A pairs for meaningful, informative content
+    2. Avoid redundant questions about the same information
+    3. Focus on key facts, specifications, and important details
+    4. Ensure answers are directly supported by the document they are generated from
+    5. Generate 3-8 Q&A pairs per document depending on content richness
+    6. Use natural, conversational question phrasing
+
+    Do not generate Q&A pairs of prices, availability, discounts, etc, anything that can dynamically change.
+
+    Return a JSON object mapping each document id (as a string) to a JSON array of objects with 'question'
+    and 'answer' fields."""
+
+def _validate_qa_pairs(qa_pairs: Any) -> List[Dict[str, str]]:
+    """Check that parsed JSON is a list of Q&A objects.
+
+    Args:
+        qa_pairs: Parsed LLM output
+
+    Returns:
+        list: The validated Q&A pairs
+
+    Raises:
+        ValueError: If the value is not a list of Q&A objects
+    """
+    if not isinstance(qa_pairs, list):
+        raise ValueError("LLM response is not a list")
+
+    for qa in qa_pairs:
+        if not isinstance(qa, dict) or 'question' not in qa or 'answer' not in qa:
+            raise ValueError("Invalid Q&A format in LLM response")
+
+    return qa_pairs
+
+def _parse_qa_pairs(result: str) -> List[Dict[str, str]]:
+    """Parse and validate the LLM response.
+
+    Args:
+        result: Raw LLM response
+
+    Returns:
+        list: List of Q&A dictionaries with 'question' and 'answer' keys
+
+    Raises:
+        ValueError: If the response is not a list of Q&A objects
+    """
+    # Parse the response using load_json from json_utils
+    return _validate_qa_pairs(load_json(result))
+
+def generate_qa_pairs(chat: ChatCompletionGenerator, content: str) -> List[Dict[str, str]]:
+    """Generate question-answer pairs from content using LLM.
+
+    Args:
+        chat: ChatCompletionGenerator instance
+        content: Page content text
+
+    Returns:
+        list: List of Q&A dictionaries with 'question' and 'answer' keys
+    """
     try:
         result = chat.generate_with_context(
-            system_prompt=system_prompt,
+            system_prompt=QA_SYSTEM_PROMPT,
             user_message=content,
             temperature=0.3
         )
+        return _parse_qa_pairs(result)
 
-        # Parse the response using load_json from json_utils
-        qa_pairs = load_json(result)
+    except Exception as e:
+        logger.error(f"Failed to generate Q&A pairs: {str(e)}")
+        return []
 
-        # Validate format
-        if not isinstance(qa_pairs, list):
-            raise ValueError("LLM response is not a list")
+async def generate_qa_pairs_async(chat: ChatCompletionGenerator, content: str) -> List[Dict[str, str]]:
+    """Generate question-answer pairs from content using the async LLM client.
 
-        for qa in qa_pairs:
-            if not isinstance(qa, dict) or 'question' not in qa or 'answer' not in qa:
-                raise ValueError("Invalid Q&A format in LLM response")
+    Args:
+        chat: ChatCompletionGenerator instance
+        content: Page content text
 
-        return qa_pairs
+    Returns:
+        list: List of Q&A dictionaries with 'question' and 'answer' keys
+    """
+    try:
+        result = await chat.generate_with_context_async(
+            system_prompt=QA_SYSTEM_PROMPT,
+            user_message=content,
+            temperature=0.3
+        )
+        return _parse_qa_pairs(result)
 
     except Exception as e:
         logger.error(f"Failed to generate Q&A pairs: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+async def generate_qa_pairs_batch_async(chat: ChatCompletionGenerator,
+                                        contents: List[str]) -> List[List[Dict[str, str]]]:
+    """Generate question-answer pairs for several documents in one LLM request.
+
+    Documents whose pairs are missing or malformed in the batched response are
+    retried individually with generate_qa_pairs_async.
+
+    Args:
+        chat: ChatCompletionGenerator instance
+        contents: Document content texts
+
+    Returns:
+        list: One list of Q&A dictionaries per input document, in input order
+    """
+    if len(contents) == 1:
+        return [await generate_qa_pairs_async(chat, contents[0])]
+
+    user_message = "\n\n".join(
+        f'<document id="{i}">\n{content}\n</document>' for i, content in enumerate(contents)
+    )
+
+    batch_pairs = {}
+    try:
+        result = await chat.generate_with_context_async(
+            system_prompt=QA_BATCH_SYSTEM_PROMPT,
+            user_message=user_message,
+            temperature=0.3
+        )
+        batch_pairs = load_json(result)
+        if not isinstance(batch_pairs, dict):
+            raise ValueError("LLM response is not an object")
+    except Exception as e:
+        logger.error(f"Failed to generate batched Q&A pairs: {str(e)}")
+        batch_pairs = {}
+
+    results = []
+    for i, content in enumerate(contents):
+        try:
+            results.append(_validate_qa_pairs(batch_pairs[str(i)]))
+        except (KeyError, ValueError):
+            logger.debug(f"Batched Q&A missing or invalid for document {i}, retrying individually")
+            results.append(await generate_qa_pairs_async(chat, content))
+    return results
@@ -1,12 +1,25 @@
 """Scrapy settings for search-plugin project."""
 
-CONCURRENT_REQUESTS = 32
+# Broad crawl settings: the crawl is IO bound, so keep many requests in flight
+# to overlap DNS, connect and response latency.
+CONCURRENT_REQUESTS = 256
+CONCURRENT_REQUESTS_PER_DOMAIN = 16
+REACTOR_THREADPOOL_MAXSIZE = 40  # threads for DNS resolution
+SCHEDULER_PRIORITY_QUEUE = 'scrapy.pqueues.DownloaderAwarePriorityQueue'
+
+# DNS
+DNSCACHE_ENABLED = True
+DNSCACHE_SIZE = 500_000
+DNS_TIMEOUT = 5
 
 # Basic crawler settings
-DOWNLOAD_TIMEOUT = 30
-DOWNLOAD_DELAY = 1.0
+DOWNLOAD_TIMEOUT = 15
 RETRY_TIMES = 3
-CONCURRENT_REQUESTS = 5
+RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429]
+
+# Politeness is handled by AutoThrottle instead of a fixed DOWNLOAD_DELAY
+AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_TARGET_CONCURRENCY = 8.0
 
 # Optional proxy middleware settings
 ZENROWS_API_KEY = '1234567890'  # Set this via environment variable
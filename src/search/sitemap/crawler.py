@@ -1,8 +1,10 @@
 """Sitemap crawler implementation."""
 import os
 import logging
-from typing import Any, Iterator
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
+from lxml import etree
 from scrapy.spiders import SitemapSpider
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
@@ -12,6 +14,19 @@ from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Full tag -> local name (namespace stripped), filled on first sight of each tag
+_LOCAL_NAMES: Dict[str, str] = {}
+
+@dataclass(slots=True)
+class SitemapEntry:
+    """Metadata of one content URL; slots keep large sitemaps compact in memory."""
+    last_modified: Optional[str]
+    priority: Optional[str]
+    changefreq: Optional[str]
+    page_type: str
+    local_file: str
+    image: Optional[List[Dict[str, Any]]]
+
 class WebsiteSitemapSpider(SitemapSpider):
     name = 'sitemap_spider'
 
@@ -35,7 +50,7 @@ class WebsiteSitemapSpider(SitemapSpider):
         super().__init__(*args, **kwargs)
 
         # Initialize metadata storage
-        self.metadata = {}
+        self.metadata: Dict[str, SitemapEntry] = {}
         self.metadata_file = os.path.join(site_dir, 'sitemap_metadata.json')
         self.stats_file = os.path.join(site_dir, 'sitemap_stats.json')
 
@@ -64,24 +79,45 @@ class WebsiteSitemapSpider(SitemapSpider):
 
     def _extract(self, elem) -> dict[str, Any]:
         d: dict[str, Any] = {}
-        for el in elem.getchildren():
-            tag = el.tag
-            assert isinstance(tag, str)
-            name = tag.split("}", 1)[1] if "}" in tag else tag
-
-            if name == "link":
-                if "href" in el.attrib:
-                    d.setdefault("alternate", []).append(el.get("href"))
-            else:
-                if el.text and el.text.strip():
-                    d[name] = el.text.strip()
+        # Worklist of (element, dict receiving its children) instead of recursion
+        stack = [(elem, d)]
+        while stack:
+            node, out = stack.pop()
+            # Elements only; lxml skips processing instructions in C
+            for el in node.iterchildren(etree.Element):
+                tag = el.tag
+                name = _LOCAL_NAMES.get(tag) or _LOCAL_NAMES.setdefault(tag, tag.rpartition("}")[2])
+
+                if name == "link":
+                    href = el.get("href")
+                    if href is not None:
+                        out.setdefault("alternate", []).append(href)
+                elif name == "image":
+                    # A URL can list many <image:image> blocks; keep them all
+                    sub: dict[str, Any] = {}
+                    out.setdefault("image", []).append(sub)
+                    stack.append((el, sub))
                 else:
-                    d[name] = self._extract(el)
+                    text = el.text
+                    stripped = text.strip() if text else ""
+                    if stripped:
+                        out[name] = stripped
+                    else:
+                        sub = {}
+                        out[name] = sub
+                        stack.append((el, sub))
         return d
 
     def _iterate(self, root) -> Iterator[dict[str, Any]]:
-        for elem in root.getchildren():
+        # Walk the parsed sitemap once, front to back, dropping each <url>
+        # once extracted so the tree shrinks while the metadata grows. The
+        # current element stays in place to keep the iterator valid; only its
+        # predecessors are deleted (each del root[0] is O(1), unlike len(root))
+        for elem in root.iterchildren(etree.Element):
             d = self._extract(elem)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del root[0]
             if "loc" in d:
                 yield d
 
@@ -104,16 +140,15 @@ class WebsiteSitemapSpider(SitemapSpider):
             page_type = 'product' if is_product else 'document'
 
             # Create metadata for each content URL
-            metadata = {
-                'last_modified': entry.get('lastmod', None),
-                'priority': entry.get('priority', None),
-                'changefreq': entry.get('changefreq', None),
-                'page_type': page_type,
-                'local_file': self._get_local_path(url),
-                'image': entry.get('image', None)
-            }
-
-            self.metadata[url] = metadata
+            image = entry.get('image')
+            self.metadata[url] = SitemapEntry(
+                last_modified=entry.get('lastmod'),
+                priority=entry.get('priority'),
+                changefreq=entry.get('changefreq'),
+                page_type=page_type,
+                local_file=self._get_local_path(url),
+                image=image
+            )
 
             # Update stats
             self.stats['total_urls'] += 1
@@ -121,26 +156,26 @@ class WebsiteSitemapSpider(SitemapSpider):
                 self.stats['product_urls'] += 1
             else:
                 self.stats['document_urls'] += 1
-            if metadata['image']:
-                self.stats['total_images'] += len(metadata['image'])
+            self.stats['total_images'] += len(image) if image else 0
 
     def _get_local_path(self, url):
         """Generate local file path for URL content."""
-        parsed = urlparse(url)
-        path = parsed.path.strip('/')
+        # Sitemap paths are POSIX-like, so plain concatenation is enough.
+        # Empty segments are dropped, as os.path.join did for '/a//b'
+        url_path = urlparse(url).path
+        path = url_path.strip('/')
+        if '//' in path:
+            path = '/'.join(part for part in path.split('/') if part)
 
         # Handle empty path or path ending with slash
         if not path:
             return 'html/index.html'
 
-        # Split path into parts
-        path_parts = path.split('/')
-
         # If the path ends with a slash, add index.html
-        if parsed.path.endswith('/'):
-            return os.path.join('html', *path_parts, 'index.html')
+        if url_path.endswith('/'):
+            return 'html/' + path + '/index.html'
 
-        return os.path.join('html', *path_parts)
+        return 'html/' + path
 
     def closed(self, reason):
         """Save metadata and stats when spider closes."""
@@ -156,6 +191,7 @@ class WebsiteSitemapSpider(SitemapSpider):
         logger.info(f"Stats: {self.stats}")
 
         # Save metadata and stats
+        # orjson serializes the entries directly, without an asdict() copy
         save_metadata(self.metadata, self.metadata_file)
         save_stats(self.stats, self.stats_file)
 
@@ -176,7 +212,19 @@ def run_spider(url, site_dir):
     # Load domain-specific config,
     config = load_config(domain)
 
-    process = CrawlerProcess(get_project_settings())
+    # A sitemap crawl is a handful of large XML files from one host, fetched
+    # by the spider itself starting at robots.txt
+    settings = get_project_settings()
+    settings.update({
+        'CONCURRENT_REQUESTS_PER_DOMAIN': config.get('sitemap_concurrency', 16),
+        'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
+        'DOWNLOAD_TIMEOUT': 60,            # sitemaps can be tens of MB
+        'ROBOTSTXT_OBEY': False,           # robots.txt is already the first request
+        'COOKIES_ENABLED': False,
+        'TELNETCONSOLE_ENABLED': False
+    })
+
+    process = CrawlerProcess(settings)
     process.crawl(WebsiteSitemapSpider,
                  url=url,
                  site_dir=site_dir,
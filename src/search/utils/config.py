@@ -1,8 +1,27 @@
 """Configuration utilities."""
 import os
+import copy
+from functools import lru_cache
 from pathlib import Path
 import yaml
 
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+@lru_cache(maxsize=100)
+def _load_yaml_file(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse a YAML file; the stat values make a changed file a cache miss."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+def _read_yaml(path: Path) -> dict:
+    """Return a private copy of the parsed YAML file, parsing it only when it changed."""
+    st = path.stat()
+    return copy.deepcopy(_load_yaml_file(str(path), st.st_mtime_ns, st.st_size))
+
 def load_config(domain: str = None) -> dict:
     """Load configuration from YAML files.
 
@@ -20,17 +39,15 @@ def load_config(domain: str = None) -> dict:
     if not default_config_path.exists():
         raise FileNotFoundError(f"Default config not found: {default_config_path}")
 
-    with open(default_config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    config = _read_yaml(default_config_path)
 
     # Load domain config if specified
     if domain:
         domain_config_path = config_dir / domain / 'config.yaml'
         if domain_config_path.exists():
-            with open(domain_config_path, 'r', encoding='utf-8') as f:
-                domain_config = yaml.safe_load(f)
-                # Merge domain config into default config
-                config.update(domain_config)
+            domain_config = _read_yaml(domain_config_path)
+            # Merge domain config into default config
+            config.update(domain_config)
 
     # Expand environment variables in data_dir
     if 'data_dir' in config:
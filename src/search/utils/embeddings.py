@@ -1,43 +1,141 @@
-"""OpenAI embeddings utility."""
+"""Embeddings utility."""
 import os
 import logging
 import numpy as np
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
-from .llm_cache import LLMCallCache
+from .llm_cache import LLMCallCache, cache_ttl_seconds
 from ..utils.config import load_config
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-class EmbeddingsGenerator:
-    """Generate embeddings using OpenAI's API with caching."""
+def _vector_to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
 
-    def __init__(self, model: str = "text-embedding-3-small"):
-        """Initialize the embeddings generator.
+def _vector_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+class OpenAIEmbeddingsBackend:
+    """Embeddings from the OpenAI API."""
+
+    def __init__(self, model: str):
+        """Initialize the OpenAI client.
 
         Args:
-            model: Model to use for embeddings (default: text-embedding-3-small)
-            cache: Optional LLMCallCache instance for embeddings
+            model: OpenAI embedding model name
 
         Raises:
             ValueError: If API key is not found in environment
         """
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        if not self.api_key:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
             raise ValueError(
                 'OpenAI API key not found. Set OPENAI_API_KEY environment variable '
                 'or add it to .env file, or pass it explicitly.'
             )
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts with one API call."""
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts
+        )
+        return [np.asarray(item.embedding, dtype=np.float32) for item in response.data]
+
+class SentenceTransformersBackend:
+    """Embeddings from a local sentence-transformers model, on GPU if available.
+
+    Requires the optional sentence-transformers package.
+    """
+
+    def __init__(self, model: str, device: Optional[str] = None, batch_size: int = 64):
+        """Load the model.
+
+        Args:
+            model: Hugging Face model name, e.g. BAAI/bge-small-en-v1.5
+            device: Torch device (default: CUDA if available, else CPU)
+            batch_size: Texts per forward pass
 
+        Raises:
+            ImportError: If sentence-transformers is not installed
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                'The sentence_transformers embeddings provider requires the '
+                'sentence-transformers package: pip install sentence-transformers'
+            ) from e
+        self.model = SentenceTransformer(model, device=device)
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts in batched forward passes."""
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return list(vectors)
+
+class EmbeddingsGenerator:
+    """Generate embeddings with caching, using the configured provider."""
+
+    def __init__(self, model: Optional[str] = None, provider: Optional[str] = None):
+        """Initialize the embeddings generator.
+
+        Args:
+            model: Model to use for embeddings (default: embeddings.model from
+                config, or text-embedding-3-small)
+            provider: Embeddings provider, "openai" or "sentence_transformers"
+                (default: embeddings.provider from config, or "openai")
+
+        Raises:
+            ValueError: If the provider is unknown, or the OpenAI API key is
+                not found in environment
+        """
         config = load_config()
+        embeddings_config = config.get('embeddings', {})
+        self.provider = provider or embeddings_config.get('provider', 'openai')
+        self.model = model or embeddings_config.get('model', 'text-embedding-3-small')
+
+        if self.provider == 'openai':
+            self.backend = OpenAIEmbeddingsBackend(self.model)
+        elif self.provider == 'sentence_transformers':
+            self.backend = SentenceTransformersBackend(
+                self.model,
+                device=embeddings_config.get('device'),
+                batch_size=embeddings_config.get('batch_size', 64)
+            )
+        else:
+            raise ValueError(f"Unknown embeddings provider: {self.provider}")
+
+        # API batches are I/O bound and run concurrently; local inference
+        # already saturates the device, so its batches run one at a time
+        if self.provider == 'openai':
+            self.concurrency = embeddings_config.get('concurrency', 8)
+        else:
+            self.concurrency = 1
+
         mongodb_uri = config['mongodb']['uri']
-        self.client = OpenAI(api_key=self.api_key)
-        self.model = model
-        self.cache = LLMCallCache[np.ndarray](mongodb_uri=mongodb_uri, collection="embeddings_cache")
-        logger.info(f"Initialized embeddings generator with model: {model}")
+        # Vectors are stored as raw float32 bytes: half the size of pickled
+        # float64 and decoded without unpickling
+        self.cache = LLMCallCache[np.ndarray](
+            mongodb_uri=mongodb_uri,
+            collection="embeddings_cache",
+            serialize=_vector_to_bytes,
+            deserialize=_vector_from_bytes,
+            value_format="float32",
+            ttl_seconds=cache_ttl_seconds(config)
+        )
+        logger.info(f"Initialized embeddings generator with {self.provider} model: {self.model}")
 
     def generate(self, texts: List[str], batch_size: int = 100) -> np.ndarray:
         """Generate embeddings for a list of texts.
@@ -56,53 +154,113 @@ class EmbeddingsGenerator:
         if not texts:
             raise ValueError("No texts provided")
 
-        # Initialize result array
-        embeddings = [None] * len(texts)
+        # Rows are written into one float32 array, allocated once the
+        # embedding dimension is known from the first vector
+        result: Optional[np.ndarray] = None
         texts_to_embed = []
         cache_positions = []
 
+        # Repeated texts are looked up and embedded once; positions below
+        # index unique_texts and each vector is copied to every occurrence
+        occurrences: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            occurrences.setdefault(text, []).append(i)
+        unique_texts = list(occurrences)
+        text_rows = list(occurrences.values())
+
+        def store(positions: List[int], vectors: List[np.ndarray]) -> None:
+            nonlocal result
+            if result is None:
+                result = np.empty((len(texts), len(vectors[0])), dtype=np.float32)
+            for pos, vector in zip(positions, vectors):
+                result[text_rows[pos]] = vector
+
         # Check cache first
         if self.cache:
-            cache_results = self.cache.get_many(texts, self.model)
+            hit_positions = []
+            hit_vectors = []
+            cache_results = self.cache.get_many(unique_texts, self.model)
             for pos, embedding in cache_results:
                 if embedding is not None:
-                    embeddings[pos] = embedding
+                    hit_positions.append(pos)
+                    hit_vectors.append(embedding)
                     logger.debug(f"Cache hit for text {pos}")
                 else:
-                    texts_to_embed.append(texts[pos])
+                    texts_to_embed.append(unique_texts[pos])
                     cache_positions.append(pos)
                     logger.debug(f"Cache miss for text {pos}")
+            if hit_positions:
+                store(hit_positions, hit_vectors)
         else:
-            texts_to_embed = texts
-            cache_positions = list(range(len(texts)))
+            texts_to_embed = unique_texts
+            cache_positions = list(range(len(unique_texts)))
 
         # Generate embeddings for cache misses
         if texts_to_embed:
-            for i in range(0, len(texts_to_embed), batch_size):
-                batch = texts_to_embed[i:i + batch_size]
-                batch_positions = cache_positions[i:i + batch_size]
-                try:
-                    response = self.client.embeddings.create(
-                        model=self.model,
-                        input=batch
-                    )
-                    # Extract embeddings from response
-                    batch_embeddings = [np.array(item.embedding) for item in response.data]
-                    logger.debug(f"Generated embeddings for batch {i//batch_size + 1}")
-
-                    # Update result array
-                    for pos, embedding in zip(batch_positions, batch_embeddings):
-                        embeddings[pos] = embedding
-
-                    # Cache new embeddings
-                    if self.cache:
-                        self.cache.set_many(batch, self.model, batch_embeddings)
-
-                except Exception as e:
-                    logger.error(f"Failed to generate embeddings for batch {i//batch_size + 1}: {str(e)}")
-                    raise RuntimeError(f"OpenAI API error: {str(e)}")
-
-        return np.array(embeddings)
+            batches = [
+                (i // batch_size + 1, texts_to_embed[i:i + batch_size], cache_positions[i:i + batch_size])
+                for i in range(0, len(texts_to_embed), batch_size)
+            ]
+            new_texts = []
+            new_embeddings = []
+            error = None
+            if len(batches) == 1 or self.concurrency <= 1:
+                for batch_number, batch, positions in batches:
+                    try:
+                        batch_embeddings = self._embed_batch(batch_number, batch)
+                    except RuntimeError as e:
+                        error = e
+                        break
+                    store(positions, batch_embeddings)
+                    new_texts.extend(batch)
+                    new_embeddings.extend(batch_embeddings)
+            else:
+                workers = min(self.concurrency, len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(self._embed_batch, batch_number, batch)
+                        for batch_number, batch, _ in batches
+                    ]
+                    for (_, batch, positions), future in zip(batches, futures):
+                        try:
+                            batch_embeddings = future.result()
+                        except RuntimeError as e:
+                            error = error or e
+                            continue
+                        store(positions, batch_embeddings)
+                        new_texts.extend(batch)
+                        new_embeddings.extend(batch_embeddings)
+
+            # Cache new embeddings in one round trip, keeping the batches that
+            # succeeded even if another one failed
+            if self.cache and new_texts:
+                self.cache.set_many(new_texts, self.model, new_embeddings)
+            if error:
+                raise error
+
+        return result
+
+    def _embed_batch(self, batch_number: int, batch: List[str]) -> List[np.ndarray]:
+        """Embed one batch.
+
+        Args:
+            batch_number: 1-based batch number, for logging
+            batch: Texts of the batch
+
+        Returns:
+            List[np.ndarray]: Embeddings of the batch
+
+        Raises:
+            RuntimeError: If API call fails
+        """
+        try:
+            batch_embeddings = self.backend.embed(batch)
+            logger.debug(f"Generated embeddings for batch {batch_number}")
+            return batch_embeddings
+
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings for batch {batch_number}: {str(e)}")
+            raise RuntimeError(f"{self.provider} embeddings error: {str(e)}")
 
     def generate_single(self, text: str) -> np.ndarray:
         """Generate embedding for a single text.
@@ -1,23 +1,26 @@
-import json
+import re
+import orjson
+
+# Leading ``` or ```json fence and trailing ``` fence of a markdown code block
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
 
 def load_json(json_string: str) -> dict:
     """Parse a JSON string.
 
     Args:
-        json_string: The JSON string.
+        json_string: The JSON string, optionally wrapped in a markdown code block.
 
     Returns:
         The parsed JSON object as a Python dictionary.
+
+    Raises:
+        orjson.JSONDecodeError: If the string is not valid JSON (a subclass
+            of json.JSONDecodeError)
     """
     try:
 
-        return json.loads(json_string)
-
-    except json.JSONDecodeError:
-        # remove the leading and trailing backticks
-        json_str = json_string.strip("```")
-
-        if json_str.startswith("json"):
-            json_str = json_str[4:]
+        return orjson.loads(json_string)
 
-        return json.loads(json_str)
+    except orjson.JSONDecodeError:
+        # remove the markdown code fences
+        return orjson.loads(_FENCE.sub("", json_string))
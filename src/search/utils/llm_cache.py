@@ -2,13 +2,15 @@
 import logging
 import hashlib
 import pickle
-from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple, TypeVar, Generic
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, FrozenSet, List, Set, Tuple, TypeVar, Generic, Callable
 import os
 
-from pymongo import MongoClient
+from pymongo import IndexModel, MongoClient
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
 from pymongo.operations import UpdateOne
 
 from search.utils.config import load_config
@@ -17,34 +19,106 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')  # Generic type for cached values
 
-project_config = load_config()
+# Entries kept in memory per cache, in front of MongoDB
+LOCAL_CACHE_SIZE = 1024
 
-class LLMCallCache(Generic[T]):
-    """Generic cache for LLM calls using MongoDB."""
+# MongoDB error code for a unique index violation (E11000)
+_DUPLICATE_KEY = 11000
+
+# MongoDB error code for an index that exists with different options
+_INDEX_OPTIONS_CONFLICT = 85
+
+def _default_database() -> str:
+    """Database name from the project config, read on first use."""
+    return load_config()['mongodb']['database']
+
+def cache_ttl_seconds(config: Dict[str, Any]) -> Optional[int]:
+    """TTL for cache entries from mongodb.cache.max_age_days in a config.
+
+    Args:
+        config: Project configuration
+
+    Returns:
+        Optional[int]: Seconds after which entries expire, or None to keep them
+    """
+    max_age_days = config['mongodb'].get('cache', {}).get('max_age_days')
+    return int(max_age_days * 24 * 60 * 60) if max_age_days else None
 
-    def __init__(self, mongodb_uri: str, collection: str, database: str = project_config['mongodb']['database']):
+def _cache_disabled() -> bool:
+    return os.environ.get('DISABLE_LLM_CACHE', '').lower() in ('true', '1', 'yes')
+
+class LLMCallCache(Generic[T]):
+    """Generic cache for LLM calls using MongoDB.
+
+    When the DISABLE_LLM_CACHE environment variable is set, constructing the
+    cache returns a _DisabledLLMCallCache instead, so enabled caches never
+    check the flag per call.
+    """
+
+    cache_disabled = False
+    # (server addresses, database, collection, ttl_seconds) whose indexes
+    # this process already created
+    _indexed: Set[Tuple[FrozenSet[Tuple[str, int]], str, str, Optional[int]]] = set()
+
+    def __new__(cls, *args, **kwargs):
+        if cls is LLMCallCache and _cache_disabled():
+            cls = _DisabledLLMCallCache
+        return super().__new__(cls)
+
+    def __init__(self, mongodb_uri: str, collection: str, database: Optional[str] = None,
+                 serialize: Callable[[T], bytes] = pickle.dumps,
+                 deserialize: Callable[[bytes], T] = pickle.loads,
+                 value_format: str = "pickle", local_size: int = LOCAL_CACHE_SIZE,
+                 client: Optional[MongoClient] = None,
+                 ttl_seconds: Optional[int] = None):
         """Initialize the cache.
 
         Args:
             collection: Collection name for specific cache type
-            database: Database name
+            database: Database name (default: mongodb.database from the project config)
+            serialize: Encodes a value for storage (default: pickle)
+            deserialize: Decodes a stored value (default: pickle)
+            value_format: Name of the encoding, stored with each entry. Entries
+                written in another format are treated as misses and rewritten.
+            local_size: Number of recently used entries kept in process, so
+                repeated lookups skip the MongoDB round trip
+            client: Existing MongoClient to share; mongodb_uri is then
+                ignored (default: a new client for mongodb_uri)
+            ttl_seconds: Age after which entries expire. MongoDB deletes them
+                through a TTL index on created_at, and older entries are
+                misses for get_many, in memory or not yet deleted (default:
+                keep the collection's current created_at index, or create one
+                without expiry)
 
         Raises:
             PyMongoError: If MongoDB connection fails
         """
-        self.cache_disabled = os.environ.get('DISABLE_LLM_CACHE', '').lower() in ('true', '1', 'yes')
-        if self.cache_disabled:
-            logger.info("LLM cache is disabled via DISABLE_LLM_CACHE environment variable")
-            return
-
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.value_format = value_format
+
+        # Recently used (text_hash, model) -> (created_at, value), least
+        # recent first. Entries past ttl_seconds are misses, as in MongoDB
+        self.local_size = local_size
+        self.ttl_seconds = ttl_seconds
+        self._local: "OrderedDict[Tuple[str, str], Tuple[datetime, T]]" = OrderedDict()
+        self._local_lock = threading.Lock()
+
+        database = database or _default_database()
         try:
-            self.client = MongoClient(mongodb_uri)
+            self.client = client or MongoClient(mongodb_uri)
             self.db = self.client[database]
             self.collection: Collection = self.db[collection]
 
-            # Create search
-            self.collection.create_index([("text_hash", 1), ("model", 1)], unique=True)
-            self.collection.create_index("created_at")
+            # Create search indexes in one round trip, once per collection
+            # per process. Collections are keyed on the servers the client
+            # targets, not on mongodb_uri, which is ignored for a passed client
+            servers = frozenset(self.client.topology_description.server_descriptions())
+            # A different TTL re-runs creation, which updates it in place
+            key = (servers, database, collection, ttl_seconds)
+            if key not in LLMCallCache._indexed:
+                self._create_indexes(ttl_seconds)
+                LLMCallCache._indexed.add(key)
 
             logger.info(f"Initialized LLM cache: {database}.{collection}")
 
@@ -52,6 +126,36 @@ class LLMCallCache(Generic[T]):
             logger.error(f"Failed to initialize MongoDB cache: {str(e)}")
             raise
 
+    def _create_indexes(self, ttl_seconds: Optional[int]) -> None:
+        """Create the lookup index and the created_at index.
+
+        Args:
+            ttl_seconds: expireAfterSeconds for the created_at index, or None
+                for no expiry
+
+        Raises:
+            PyMongoError: If index creation fails
+        """
+        created_at = (IndexModel("created_at") if ttl_seconds is None
+                      else IndexModel("created_at", expireAfterSeconds=ttl_seconds))
+        try:
+            self.collection.create_indexes([
+                IndexModel([("text_hash", 1), ("model", 1)], unique=True),
+                created_at
+            ])
+        except OperationFailure as e:
+            # created_at_1 exists with other options, e.g. the TTL set by setup_db
+            if e.code != _INDEX_OPTIONS_CONFLICT:
+                raise
+            self.collection.create_index([("text_hash", 1), ("model", 1)], unique=True)
+            if ttl_seconds is not None:
+                # Change the TTL in place; create_index would fail on the conflict
+                self.db.command({
+                    'collMod': self.collection.name,
+                    'index': {'keyPattern': {'created_at': 1}, 'expireAfterSeconds': ttl_seconds}
+                })
+                logger.info(f"Updated created_at TTL to {ttl_seconds} seconds")
+
     def _compute_hashes(self, texts: List[str], model: str) -> List[str]:
         """Compute hashes for multiple texts.
 
@@ -62,91 +166,150 @@ class LLMCallCache(Generic[T]):
         Returns:
             List[str]: List of SHA-256 hashes
         """
-        return [hashlib.sha256(f"{text}:{model}".encode()).hexdigest()
-                for text in texts]
+        # Same keys as hashing f"{text}:{model}", with the suffix encoded once
+        suffix = f":{model}".encode()
+        sha256 = hashlib.sha256
+        return [sha256(text.encode() + suffix).hexdigest() for text in texts]
 
-    def get_many(self, texts: List[str], model: str) -> List[Tuple[int, Optional[T]]]:
+    def get_many(self, texts: List[str], model: str,
+                 is_hashed: bool = False) -> List[Tuple[int, Optional[T]]]:
         """Get cached values for multiple texts.
 
         Args:
             texts: List of input texts
             model: Model name
+            is_hashed: Whether texts are already cache keys from the caller
 
         Returns:
             List[Tuple[int, Optional[T]]]: List of (position, value) tuples
                 where value is None for cache misses
         """
-        if self.cache_disabled:
-            return [(i, None) for i in range(len(texts))]
-
-        try:
-            text_hashes = self._compute_hashes(texts, model)
-
-            # Fetch all matching documents
-            docs = self.collection.find({
-                "text_hash": {"$in": text_hashes},
-                "model": model
-            })
-
-            # Create hash to document mapping
-            hash_to_doc = {doc["text_hash"]: doc for doc in docs}
-
-            # Create result list with original positions
-            results = []
-            for i, (text, text_hash) in enumerate(zip(texts, text_hashes)):
-                doc = hash_to_doc.get(text_hash)
-                if doc:
-                    # Cache hit
-                    value = pickle.loads(doc["value"])
-                    results.append((i, value))
+        text_hashes = texts if is_hashed else self._compute_hashes(texts, model)
+        results: List[Optional[T]] = [None] * len(texts)
+
+        # Serve what we can from memory
+        missing = []
+        expired_before = (datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                          if self.ttl_seconds is not None else None)
+        with self._local_lock:
+            for i, text_hash in enumerate(text_hashes):
+                key = (text_hash, model)
+                entry = self._local.get(key)
+                if entry is not None and expired_before is not None and entry[0] < expired_before:
+                    # Already deleted (or about to be) by the TTL index
+                    del self._local[key]
+                    entry = None
+                if entry is not None:
+                    self._local.move_to_end(key)
+                    results[i] = entry[1]
                 else:
-                    # Cache miss
-                    results.append((i, None))
-
-            return results
-
-        except PyMongoError as e:
-            logger.error(f"Cache get_many error: {str(e)}")
-            return [(i, None) for i in range(len(texts))]
+                    missing.append(i)
+
+        if missing:
+            try:
+                # Fetch all matching documents, leaving out the stored text.
+                # The first batch is sized to the lookup instead of the server's
+                # default of 101 documents, so large lookups skip getMore calls
+                docs = self.collection.find(
+                    {"text_hash": {"$in": [text_hashes[i] for i in missing]}, "model": model},
+                    projection={"_id": 0, "text_hash": 1, "value": 1, "format": 1, "created_at": 1},
+                    batch_size=len(missing)
+                )
+
+                # Create hash to document mapping
+                hash_to_doc = {doc["text_hash"]: doc for doc in docs}
+
+                fetched = []
+                now = datetime.utcnow()
+                for i in missing:
+                    doc = hash_to_doc.get(text_hashes[i])
+                    # Entries from before formats were recorded are pickles
+                    if not doc or doc.get("format", "pickle") != self.value_format:
+                        continue
+                    # Naive UTC, like the timestamps written by set_many
+                    created_at = (doc.get("created_at") or now).replace(tzinfo=None)
+                    # The TTL monitor only deletes about once a minute
+                    if expired_before is not None and created_at < expired_before:
+                        continue
+                    # Cache hit
+                    results[i] = self.deserialize(doc["value"])
+                    fetched.append((text_hashes[i], created_at, results[i]))
+                self._remember(model, fetched)
+
+            except PyMongoError as e:
+                logger.error(f"Cache get_many error: {str(e)}")
+
+        # Position and value, None for cache misses
+        return list(enumerate(results))
+
+    def _remember(self, model: str, entries: List[Tuple[str, datetime, T]]) -> None:
+        """Keep (text_hash, created_at, value) entries in memory, evicting the least recent."""
+        with self._local_lock:
+            for text_hash, created_at, value in entries:
+                key = (text_hash, model)
+                self._local[key] = (created_at, value)
+                self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
 
     def set_many(self, texts: List[str], model: str,
-                values: List[T]) -> bool:
+                values: List[T], is_hashed: bool = False) -> bool:
         """Store multiple values in cache.
 
         Args:
             texts: List of input texts
             model: Model name
             values: List of values to cache
+            is_hashed: Whether texts are already cache keys from the caller.
+                The text is then not stored with the entry.
 
         Returns:
             bool: True if all operations successful
         """
-        if self.cache_disabled:
-            return True
-
         try:
-            text_hashes = self._compute_hashes(texts, model)
+            text_hashes = texts if is_hashed else self._compute_hashes(texts, model)
             current_time = datetime.utcnow()
+            self._remember(model, [(text_hash, current_time, value)
+                                   for text_hash, value in zip(text_hashes, values)])
 
-            # Prepare bulk upsert operations
-            operations = []
+            docs = []
             for text, text_hash, value in zip(texts, text_hashes, values):
                 doc = {
                     "text_hash": text_hash,
                     "model": model,
-                    "text": text,
-                    "value": pickle.dumps(value),
+                    "value": self.serialize(value),
+                    "format": self.value_format,
                     "created_at": current_time
                 }
+                if not is_hashed:
+                    doc["text"] = text
+                docs.append(doc)
+
+            if not docs:
+                return True
+
+            # Nearly every write is for a miss, so insert without a lookup and
+            # let the unique index reject keys that already exist
+            try:
+                self.collection.insert_many(docs, ordered=False)
+                return True
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+                    raise
+                duplicates = [docs[error["index"]] for error in errors]
+
+            # Existing entries (stale formats, or concurrent writers) are
+            # overwritten, as before
+            operations = []
+            for doc in duplicates:
+                doc.pop("_id", None)
                 operations.append(UpdateOne(
-                    {"text_hash": text_hash, "model": model},
+                    {"text_hash": doc["text_hash"], "model": model},
                     {"$set": doc},
                     upsert=True
                 ))
-
-            # Execute bulk write
-            if operations:
-                self.collection.bulk_write(operations)
+            self.collection.bulk_write(operations)
             return True
 
         except PyMongoError as e:
@@ -154,26 +317,31 @@ class LLMCallCache(Generic[T]):
             return False
 
     # Keep single-item methods for convenience
-    def get(self, text: str, model: str) -> Optional[T]:
+    def get(self, text: str, model: str, is_hashed: bool = False) -> Optional[T]:
         """Get single value from cache."""
-        results = self.get_many([text], model)
+        results = self.get_many([text], model, is_hashed)
         return results[0][1] if results else None
 
-    def set(self, text: str, model: str, value: T) -> bool:
+    def set(self, text: str, model: str, value: T, is_hashed: bool = False) -> bool:
         """Store single value in cache."""
-        return self.set_many([text], model, [value])
+        return self.set_many([text], model, [value], is_hashed)
 
     def cleanup_before(self, timestamp: datetime) -> Dict[str, Any]:
         """Remove entries created before specified timestamp.
 
+        Caches created with ttl_seconds are pruned by MongoDB itself; this is
+        for explicit cutoffs.
+
         Args:
             timestamp: Remove entries created before this time
 
         Returns:
             dict: Cleanup statistics
         """
-        if self.cache_disabled:
-            return {"status": "cache_disabled"}
+        # Drop the same entries from memory
+        with self._local_lock:
+            for key in [key for key, (created_at, _) in self._local.items() if created_at < timestamp]:
+                del self._local[key]
 
         try:
             result = self.collection.delete_many({
@@ -197,8 +365,8 @@ class LLMCallCache(Generic[T]):
         Returns:
             bool: True if successful
         """
-        if self.cache_disabled:
-            return True
+        with self._local_lock:
+            self._local.clear()
 
         try:
             self.collection.delete_many({})
@@ -207,4 +375,26 @@ class LLMCallCache(Generic[T]):
 
         except PyMongoError as e:
             logger.error(f"Cache clear error: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+class _DisabledLLMCallCache(LLMCallCache[T]):
+    """Cache that stores nothing, used when DISABLE_LLM_CACHE is set."""
+
+    cache_disabled = True
+
+    def __init__(self, *args, **kwargs):
+        logger.info("LLM cache is disabled via DISABLE_LLM_CACHE environment variable")
+
+    def get_many(self, texts: List[str], model: str,
+                 is_hashed: bool = False) -> List[Tuple[int, Optional[T]]]:
+        return [(i, None) for i in range(len(texts))]
+
+    def set_many(self, texts: List[str], model: str,
+                values: List[T], is_hashed: bool = False) -> bool:
+        return True
+
+    def cleanup_before(self, timestamp: datetime) -> Dict[str, Any]:
+        return {"status": "cache_disabled"}
+
+    def clear(self) -> bool:
+        return True
@@ -2,13 +2,23 @@
 import os
 import logging
 import asyncio
+import hashlib
 from typing import List, Dict, Any, Optional, AsyncGenerator
-from openai import OpenAI, AsyncOpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from tenacity import retry, stop_after_attempt, wait_exponential
-from .llm_cache import LLMCallCache
+from .llm_cache import LLMCallCache, cache_ttl_seconds
 from ..utils.config import load_config
 logger = logging.getLogger(__name__)
 
+# Default number of chat completions kept in flight by the async processors
+DEFAULT_CONCURRENCY = 64
+
+# Connection pool shared by all calls through one generator. Over HTTP/2 many
+# concurrent completions multiplex onto a few connections; the keepalive limit
+# matches max_connections so bursts don't tear down and reopen connections.
+_HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+
 class ChatCompletionGenerator:
     """Generate chat completions using OpenAI's API."""
 
@@ -30,30 +40,51 @@ class ChatCompletionGenerator:
                 'or add it to .env file.'
             )
 
-        self.client = OpenAI(api_key=self.api_key)
-        self.async_client = AsyncOpenAI(api_key=self.api_key)
+        self.client = OpenAI(
+            api_key=self.api_key,
+            http_client=DefaultHttpxClient(http2=True, limits=_HTTP_LIMITS)
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=DefaultAsyncHttpxClient(http2=True, limits=_HTTP_LIMITS)
+        )
         self.model = model
         self.max_retries = max_retries
 
         # Initialize cache if URI provided
         config = load_config()
         mongodb_uri = config['mongodb']['uri']
-        self.cache = LLMCallCache[str](mongodb_uri=mongodb_uri, collection="chat_cache")
+        self.cache = LLMCallCache[str](
+            mongodb_uri=mongodb_uri,
+            collection="chat_cache",
+            ttl_seconds=cache_ttl_seconds(config)
+        )
         logger.info(f"Initialized chat completion generator with model: {model}")
 
-    def _get_cache_text(self, messages: List[Dict[str, str]], temperature: float) -> str:
-        """Create cache key text from messages and parameters.
+    def _get_cache_key(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        """Create the cache key from messages and parameters.
+
+        The messages are streamed into one SHA-256 instead of being joined into
+        a prompt-sized string. The digest equals the hash LLMCallCache computes
+        for the text f"{temperature}|role:content|...:{model}", so entries
+        cached before keys were hashed here are still found.
 
         Args:
             messages: List of message dictionaries
             temperature: Temperature parameter
 
         Returns:
-            str: Cache key text
+            str: Hex SHA-256 cache key
         """
-        return f"{temperature}|" + "|".join(
-            f"{msg['role']}:{msg['content']}" for msg in messages
-        )
+        h = hashlib.sha256(f"{temperature}|".encode())
+        for i, msg in enumerate(messages):
+            if i:
+                h.update(b"|")
+            h.update(msg['role'].encode())
+            h.update(b":")
+            h.update(msg['content'].encode())
+        h.update(f":{self.model}".encode())
+        return h.hexdigest()
 
     @retry(
         stop=stop_after_attempt(3),
@@ -79,8 +110,8 @@ class ChatCompletionGenerator:
         try:
             # Check cache first if available
             if self.cache:
-                cache_text = self._get_cache_text(messages, temperature)
-                cached_response = self.cache.get(cache_text, self.model)
+                cache_key = self._get_cache_key(messages, temperature)
+                cached_response = self.cache.get(cache_key, self.model, is_hashed=True)
                 if cached_response is not None:
                     logger.debug("Cache hit for chat completion")
                     return cached_response
@@ -96,8 +127,7 @@ class ChatCompletionGenerator:
 
             # Cache the response if cache is available
             if self.cache:
-                cache_text = self._get_cache_text(messages, temperature)
-                self.cache.set(cache_text, self.model, result)
+                self.cache.set(cache_key, self.model, result, is_hashed=True)
                 logger.debug("Cached chat completion response")
 
             return result
@@ -114,7 +144,7 @@ class ChatCompletionGenerator:
     async def generate_async(self, messages: List[Dict[str, str]],
                            temperature: float = 0.7,
                            max_tokens: Optional[int] = None) -> str:
-        """Generate chat completion response asynchronously with retries.
+        """Generate chat completion response asynchronously with retries and caching.
 
         Args:
             messages: List of message dictionaries with 'role' and 'content'
@@ -128,13 +158,33 @@ class ChatCompletionGenerator:
             RuntimeError: If API call fails after retries
         """
         try:
+            # Check cache first if available; the cache client is blocking,
+            # so it runs off the event loop
+            if self.cache:
+                cache_key = self._get_cache_key(messages, temperature)
+                cached_response = await asyncio.to_thread(
+                    self.cache.get, cache_key, self.model, is_hashed=True
+                )
+                if cached_response is not None:
+                    logger.debug("Cache hit for chat completion")
+                    return cached_response
+
             response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
-            return response.choices[0].message.content
+            result = response.choices[0].message.content
+
+            # Cache the response if cache is available
+            if self.cache:
+                await asyncio.to_thread(
+                    self.cache.set, cache_key, self.model, result, is_hashed=True
+                )
+                logger.debug("Cached chat completion response")
+
+            return result
 
         except Exception as e:
             logger.error(f"Failed to generate async chat completion: {str(e)}")
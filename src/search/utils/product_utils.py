@@ -1,5 +1,5 @@
 """Product-related utility functions."""
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit
 
 def get_product_handle(url: str) -> str:
     """Extract product handle from URL.
@@ -10,5 +10,10 @@ def get_product_handle(url: str) -> str:
     Returns:
         str: Product handle (last part of URL path)
     """
-    path = urlparse(url).path
-    return path.strip('/').split('/')[-1]
\ No newline at end of file
+    # urlsplit skips urlparse's ;params handling, which makes it several times
+    # faster. Only paths containing ';' need urlparse to strip the params.
+    path = urlsplit(url).path
+    if ';' in path:
+        path = urlparse(url).path
+    # rpartition takes the last segment without building a list of all of them
+    return path.strip('/').rpartition('/')[2]
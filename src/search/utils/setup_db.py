@@ -1,6 +1,8 @@
 """Setup script for MongoDB database and collections."""
+import atexit
 import logging
-from pymongo import MongoClient, ASCENDING
+from typing import Dict
+from pymongo import MongoClient, ASCENDING, IndexModel
 from pymongo.errors import PyMongoError
 
 from search.utils.config import load_config
@@ -9,6 +11,28 @@ logger = logging.getLogger(__name__)
 
 project_config = load_config()
 
+# How long setup waits for a reachable MongoDB server
+SERVER_SELECTION_TIMEOUT_MS = 2000
+
+# Clients by URI, reused across setup_database calls and closed at exit
+_clients: Dict[str, MongoClient] = {}
+
+def _client_for(uri: str) -> MongoClient:
+    """Get the pooled client for a URI, connecting on first use."""
+    client = _clients.get(uri)
+    if client is None:
+        # Fail fast when the server is unreachable instead of the 30 s default
+        client = _clients[uri] = MongoClient(
+            uri, serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS, maxPoolSize=16
+        )
+    return client
+
+@atexit.register
+def _close_clients():
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+
 # Default MongoDB configuration
 DEFAULT_CONFIG = {
     'database': project_config['mongodb']['database'],
@@ -16,7 +40,7 @@ DEFAULT_CONFIG = {
         'embeddings_cache': 'embeddings_cache'
     },
     'cache': {
-        'max_age_days': 30,
+        'max_age_days': project_config['mongodb'].get('cache', {}).get('max_age_days', 30),
         'index_fields': [
             'text_hash',
             'model',
@@ -40,9 +64,8 @@ def setup_database(uri: str = None, config: dict = None) -> bool:
         config = config or DEFAULT_CONFIG
 
         # Use provided URI or default
-        site_config = load_config()
-        uri = uri or site_config['mongodb']['uri']
-        client = MongoClient(uri)
+        uri = uri or project_config['mongodb']['uri']
+        client = _client_for(uri)
 
         # Get database
         db = client[config['database']]
@@ -51,21 +74,41 @@ def setup_database(uri: str = None, config: dict = None) -> bool:
         # Setup embeddings cache collection
         cache_collection = db[config['collections']['embeddings_cache']]
 
-        # Create search
-        cache_collection.create_index(
-            [("text_hash", ASCENDING), ("model", ASCENDING)],
-            unique=True,
-            background=True
-        )
-        cache_collection.create_index(
-            "created_at",
-            background=True,
-            expireAfterSeconds=config['cache']['max_age_days'] * 24 * 60 * 60
-        )
+        # One round trip for the existing indexes; only missing ones are created
+        existing = {idx['name']: idx for idx in cache_collection.list_indexes()}
+
+        # Missing indexes are built with one createIndexes command
+        models = []
+        if 'text_hash_1_model_1' not in existing:
+            models.append(IndexModel(
+                [("text_hash", ASCENDING), ("model", ASCENDING)],
+                unique=True,
+                background=True
+            ))
+
+        ttl_seconds = config['cache']['max_age_days'] * 24 * 60 * 60
+        created_at_index = existing.get('created_at_1')
+        if created_at_index is None:
+            models.append(IndexModel(
+                [("created_at", ASCENDING)],
+                background=True,
+                expireAfterSeconds=ttl_seconds
+            ))
+        elif created_at_index.get('expireAfterSeconds') != ttl_seconds:
+            # Change the TTL in place; create_index would fail on the option conflict
+            db.command({
+                'collMod': cache_collection.name,
+                'index': {'keyPattern': {'created_at': 1}, 'expireAfterSeconds': ttl_seconds}
+            })
+            logger.info(f"Updated created_at TTL to {ttl_seconds} seconds")
 
         for field in config['cache']['index_fields']:
             if field not in ['text_hash', 'model', 'created_at']:  # Skip already created
-                cache_collection.create_index(field, background=True)
+                if f"{field}_1" not in existing:
+                    models.append(IndexModel([(field, ASCENDING)], background=True))
+
+        if models:
+            cache_collection.create_indexes(models)
 
         logger.info(f"Setup complete for collection: {config['collections']['embeddings_cache']}")
         return True
@@ -73,8 +116,6 @@ def setup_database(uri: str = None, config: dict = None) -> bool:
     except PyMongoError as e:
         logger.error(f"Database setup failed: {str(e)}")
         return False
-    finally:
-        client.close()
 
 def main():
     """Main entry point for database setup."""
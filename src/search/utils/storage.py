@@ -1,16 +1,43 @@
 """Storage utilities."""
-import json
+import mmap
 import os
+from functools import lru_cache
+import orjson
 
 def save_metadata(data, filepath):
-    """Save metadata to JSON file."""
+    """Save metadata to JSON file.
+
+    Metadata files can hold one entry per page of a site, so they are written
+    compact with orjson. Dataclass values are serialized as JSON objects.
+    """
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+
+# Files at least this large are parsed straight from a memory map
+MMAP_MIN_BYTES = 64 * 1024
+
+@lru_cache(maxsize=8)
+def _load_metadata_file(filepath, mtime_ns, size):
+    """Parse a metadata file; the stat values make a changed file a cache miss."""
+    with open(filepath, 'rb') as f:
+        if size < MMAP_MIN_BYTES:
+            return orjson.loads(f.read())
+        # Parse from the page cache without reading a copy of the file first
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
 
 def load_metadata(filepath):
     """Load metadata from JSON file.
 
+    The parsed metadata is cached by path and modification time, so pipeline
+    stages in one process share a single parse of each file. The returned dict
+    is shared between callers and must be treated as read-only.
+
     Args:
         filepath: Path to the JSON metadata file
 
@@ -19,13 +46,39 @@ def load_metadata(filepath):
 
     Raises:
         FileNotFoundError: If the metadata file doesn't exist
-        json.JSONDecodeError: If the file contains invalid JSON
+        orjson.JSONDecodeError: If the file contains invalid JSON (a subclass
+            of json.JSONDecodeError)
+    """
+    st = os.stat(filepath)
+    return _load_metadata_file(os.path.abspath(filepath), st.st_mtime_ns, st.st_size)
+
+def load_metadata_jsonl(filepath):
+    """Load metadata written as JSON Lines, one {key: value} object per line.
+
+    Later lines override earlier ones for the same key. A truncated last line,
+    left by a process killed mid-write, is skipped.
+
+    Args:
+        filepath: Path to the JSON Lines metadata file
+
+    Returns:
+        dict: Loaded metadata
+
+    Raises:
+        FileNotFoundError: If the metadata file doesn't exist
     """
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    metadata = {}
+    with open(filepath, 'rb') as f:
+        for line in f:
+            try:
+                metadata.update(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                if line.endswith(b'\n'):
+                    raise
+    return metadata
 
 def save_stats(stats, filepath):
     """Save stats to JSON file."""
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w') as f:
-        json.dump(stats, f, indent=2)
\ No newline at end of file
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
\ No newline at end of file
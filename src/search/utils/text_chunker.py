@@ -1,20 +1,36 @@
 """Text chunking utilities."""
+import re
 import tiktoken
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
+
+@lru_cache(maxsize=4)
+def _get_encoder(name: str) -> tiktoken.Encoding:
+    """Load a tiktoken encoding once per process.
+
+    The Encoding is shared by every TextChunker; encode and decode are
+    thread-safe, so chunkers used from worker threads can share it too.
+    """
+    return tiktoken.get_encoding(name)
 
 class TextChunker:
     """Handles text chunking logic."""
 
-    def __init__(self, sentence_splitters: List[str], max_tokens: int):
+    def __init__(self, sentence_splitters: List[str], max_tokens: int,
+                 tokenizer: Optional[tiktoken.Encoding] = None):
         """Initialize text chunker.
 
         Args:
             sentence_splitters: List of strings to split sentences on
             max_tokens: Maximum number of tokens per chunk
+            tokenizer: Encoding used to count tokens (default: the shared
+                cl100k_base encoding)
         """
         self.sentence_splitters = sentence_splitters
         self.max_tokens = max_tokens
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        # One alternation of all splitters, so the text is scanned once
+        self._split_re = re.compile("|".join(map(re.escape, sentence_splitters))) if sentence_splitters else None
+        self.tokenizer = tokenizer or _get_encoder("cl100k_base")
 
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences.
@@ -25,13 +41,8 @@ class TextChunker:
         Returns:
             List of sentences
         """
-        sentences = [text]
-        for splitter in self.sentence_splitters:
-            new_sentences = []
-            for sentence in sentences:
-                new_sentences.extend(sentence.split(splitter))
-            sentences = new_sentences
-        return [s.strip() for s in sentences if s.strip()]
+        sentences = self._split_re.split(text) if self._split_re else [text]
+        return [s for s in (sentence.strip() for sentence in sentences) if s]
 
     def chunk_text(self, text: str) -> List[str]:
         """Split text into chunks respecting sentence boundaries.
@@ -47,15 +58,18 @@ class TextChunker:
         current_chunk = []
         current_tokens = 0
 
-        for sentence in sentences:
-            sentence_tokens = len(self.tokenizer.encode(sentence))
+        # Tokenize all sentences in one call; ordinary encoding skips the
+        # special token scan, which plain page text never needs
+        all_tokens = self.tokenizer.encode_ordinary_batch(sentences)
+
+        for sentence, tokens in zip(sentences, all_tokens):
+            sentence_tokens = len(tokens)
 
             if sentence_tokens > self.max_tokens:
                 # Split long sentence by tokens
-                tokens = self.tokenizer.encode(sentence)
-                for i in range(0, len(tokens), self.max_tokens):
-                    chunk_tokens = tokens[i:i + self.max_tokens]
-                    chunks.append(self.tokenizer.decode(chunk_tokens))
+                chunks.extend(self.tokenizer.decode_batch(
+                    [tokens[i:i + self.max_tokens] for i in range(0, sentence_tokens, self.max_tokens)]
+                ))
                 continue
 
             if current_tokens + sentence_tokens > self.max_tokens:
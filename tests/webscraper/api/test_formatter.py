@@ -0,0 +1,97 @@
+"""Tests for search result formatter."""
+import asyncio
+import json
+import os
+import pytest
+from search.api.formatter import SearchResultFormatter
+
+CONFIG = {
+    "api": {"search": {"max_products": 2}},
+    "ranking": {"product_boost": 2.0}
+}
+
+@pytest.fixture
+def site_dir(tmp_path):
+    """Create a site directory with sitemap metadata and product files."""
+    metadata = {
+        "http://test.com/products/a": {"page_type": "product", "title": "A"},
+        "http://test.com/products/b": {"page_type": "product", "title": "B"},
+        "http://test.com/products/c": {"page_type": "product", "title": "C"},
+        "http://test.com/products/missing": {"page_type": "product", "title": "Missing"},
+        "http://test.com/docs/guide": {"page_type": "document", "title": "Guide"}
+    }
+    with open(tmp_path / 'sitemap_metadata.json', 'w') as f:
+        json.dump(metadata, f)
+
+    os.makedirs(tmp_path / 'products')
+    for handle in ["a", "b", "c"]:
+        with open(tmp_path / 'products' / f"{handle}.json", 'w') as f:
+            json.dump({"name": f"Product {handle.upper()}"}, f)
+    return str(tmp_path)
+
+def make_result(url, score, chunk_type):
+    return {
+        "title": url,
+        "url": url,
+        "content": f"content of {url}",
+        "chunk_type": chunk_type,
+        "metadata": {},
+        "score": score
+    }
+
+def test_product_boost_outranks_document(site_dir):
+    """Test that boosted products beat a higher raw document score."""
+    formatter = SearchResultFormatter(site_dir, CONFIG)
+    results = asyncio.run(formatter.format_results([
+        make_result("http://test.com/docs/guide", 0.8, "document"),
+        make_result("http://test.com/products/a", 0.5, "product")
+    ]))
+
+    assert results["answer"] is None
+    assert [p["title"] for p in results["products"]] == ["Product A"]
+
+def test_document_first_returns_answer(site_dir):
+    """Test that a top-ranked document is returned as the answer."""
+    formatter = SearchResultFormatter(site_dir, CONFIG)
+    results = asyncio.run(formatter.format_results([
+        make_result("http://test.com/products/a", 0.1, "product"),
+        make_result("http://test.com/docs/guide", 0.9, "document")
+    ]))
+
+    assert results["products"] == []
+    assert results["answer"]["url"] == "http://test.com/docs/guide"
+
+def test_products_ranked_and_limited(site_dir):
+    """Test that products are ordered by score and capped at max_products."""
+    formatter = SearchResultFormatter(site_dir, CONFIG)
+    results = asyncio.run(formatter.format_results([
+        make_result("http://test.com/products/a", 0.3, "product"),
+        make_result("http://test.com/unknown", 0.95, "product"),
+        make_result("http://test.com/products/b", 0.4, "product"),
+        make_result("http://test.com/products/c", 0.2, "product")
+    ]))
+
+    # The first hit has no metadata, so nothing is returned
+    assert results == {"products": [], "answer": None}
+
+    results = asyncio.run(formatter.format_results([
+        make_result("http://test.com/products/a", 0.3, "product"),
+        make_result("http://test.com/products/b", 0.4, "product"),
+        make_result("http://test.com/products/c", 0.2, "product")
+    ]))
+    assert [p["title"] for p in results["products"]] == ["Product B", "Product A"]
+
+def test_missing_product_file_is_backfilled(site_dir):
+    """Test that a product without a data file is replaced by the next one."""
+    formatter = SearchResultFormatter(site_dir, CONFIG)
+    results = asyncio.run(formatter.format_results([
+        make_result("http://test.com/products/missing", 0.9, "product"),
+        make_result("http://test.com/products/a", 0.3, "product"),
+        make_result("http://test.com/products/c", 0.2, "product")
+    ]))
+    assert [p["title"] for p in results["products"]] == ["Product A", "Product C"]
+
+def test_empty_results(site_dir):
+    """Test formatting with no search results."""
+    formatter = SearchResultFormatter(site_dir, CONFIG)
+    assert asyncio.run(formatter.format_results([])) == {"products": [], "answer": None}
@@ -0,0 +1,46 @@
+"""Tests for search response cache."""
+import numpy as np
+from unittest.mock import patch
+from search.api.response_cache import SearchResponseCache
+
+RESPONSE = {"products": [], "answer": {"url": "http://test.com/doc", "content": "Test"}}
+
+def test_exact_hit():
+    """Test exact query lookups, ignoring surrounding whitespace."""
+    cache = SearchResponseCache()
+    cache.put("test.com", "tents", 20, np.array([1.0, 0.0]), RESPONSE)
+
+    assert cache.get("test.com", " tents ", 20) == RESPONSE
+    assert cache.get("test.com", "tents", 10) is None
+    assert cache.get("other.com", "tents", 20) is None
+
+def test_similar_hit():
+    """Test that near-duplicate embeddings reuse the cached response."""
+    cache = SearchResponseCache(similarity_threshold=0.92)
+    cache.put("test.com", "tents", 20, np.array([1.0, 0.0]), RESPONSE)
+
+    assert cache.get_similar("test.com", 20, np.array([0.99, 0.05])) == RESPONSE
+    assert cache.get_similar("test.com", 20, np.array([0.0, 1.0])) is None
+    assert cache.get_similar("test.com", 10, np.array([1.0, 0.0])) is None
+
+def test_entries_expire():
+    """Test that entries are dropped after the ttl."""
+    cache = SearchResponseCache(ttl=60)
+    with patch("search.api.response_cache.time.monotonic", return_value=0.0):
+        cache.put("test.com", "tents", 20, np.array([1.0, 0.0]), RESPONSE)
+
+    with patch("search.api.response_cache.time.monotonic", return_value=61.0):
+        assert cache.get("test.com", "tents", 20) is None
+        assert cache.get_similar("test.com", 20, np.array([1.0, 0.0])) is None
+
+def test_max_entries_evicts_oldest():
+    """Test that the least recently used exact entry is evicted."""
+    cache = SearchResponseCache(max_entries=2)
+    for query in ["a", "b"]:
+        cache.put("test.com", query, 20, np.array([1.0, 0.0]), RESPONSE)
+    cache.get("test.com", "a", 20)
+    cache.put("test.com", "c", 20, np.array([1.0, 0.0]), RESPONSE)
+
+    assert cache.get("test.com", "a", 20) == RESPONSE
+    assert cache.get("test.com", "b", 20) is None
+    assert cache.get("test.com", "c", 20) == RESPONSE
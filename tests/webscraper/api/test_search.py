@@ -2,9 +2,11 @@
 import pytest
 from fastapi.testclient import TestClient
 import numpy as np
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from search.api.search import app
 from search.utils.embeddings import EmbeddingsGenerator
+from search.utils.config import load_config
+from search.utils.storage import save_metadata
 
 client = TestClient(app)
 
@@ -14,10 +16,20 @@ def test_search_invalid_domain():
     assert response.status_code == 404
     assert "Index not found" in response.json()["detail"]
 
-@patch("search.api.search.Elasticsearch")
-@patch("search.api.search.EmbeddingsGenerator")
-def test_search_success(mock_embeddings, mock_es):
+@patch("search.api.search.load_config")
+@patch("search.api.search.get_es_client")
+@patch("search.api.search.get_embeddings")
+def test_search_success(mock_embeddings, mock_es, mock_config, tmp_path):
     """Test successful search."""
+    # Site data with the sitemap metadata the formatter loads
+    config = load_config()
+    config["data_dir"] = str(tmp_path)
+    mock_config.return_value = config
+    site_dir = tmp_path / "test-domain"
+    site_dir.mkdir()
+    save_metadata({"http://test.com/doc1": {"page_type": "document"}},
+                  str(site_dir / "sitemap_metadata.json"))
+
     # Mock embeddings
     mock_generator = Mock(spec=EmbeddingsGenerator)
     mock_generator.generate_single.return_value = np.array([1.0] * 1536)
@@ -25,8 +37,8 @@ def test_search_success(mock_embeddings, mock_es):
 
     # Mock elasticsearch response
     mock_es_instance = Mock()
-    mock_es_instance.indices.exists.return_value = True
-    mock_es_instance.search.return_value = {
+    mock_es_instance.indices.exists = AsyncMock(return_value=True)
+    mock_es_instance.search = AsyncMock(return_value={
         "took": 5,
         "hits": {
             "total": {"value": 1},
@@ -35,28 +47,27 @@ def test_search_success(mock_embeddings, mock_es):
                 "_source": {
                     "title": "Test Document",
                     "url": "http://test.com/doc1",
-                    "chunks": [{"content": "Test content"}]
+                    "chunks": [{"content": "Test content", "chunk_type": "document"}]
                 }
             }]
         }
-    }
+    })
     mock_es.return_value = mock_es_instance
 
     # Test API
     response = client.get("/search/test-domain", params={"query": "test query"})
     assert response.status_code == 200
     data = response.json()
-    assert len(data["results"]) == 1
-    assert data["results"][0]["title"] == "Test Document"
-    assert data["total"] == 1
+    assert data["products"] == []
+    assert data["answer"] == {"url": "http://test.com/doc1", "content": "Test content"}
 
-@patch("search.api.search.Elasticsearch")
-@patch("search.api.search.EmbeddingsGenerator")
+@patch("search.api.search.get_es_client")
+@patch("search.api.search.get_embeddings")
 def test_search_embeddings_error(mock_embeddings, mock_es):
     """Test search with embeddings error."""
     # Mock elasticsearch index check
     mock_es_instance = Mock()
-    mock_es_instance.indices.exists.return_value = True
+    mock_es_instance.indices.exists = AsyncMock(return_value=True)
     mock_es.return_value = mock_es_instance
 
     # Mock embeddings error
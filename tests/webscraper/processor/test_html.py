@@ -1,25 +1,10 @@
 """Tests for HTML processor."""
-import os
 import pytest
 from search.processor.html import process_html, clean_text
 
-# Test data directory
-TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'test_data')
-
-def test_clean_text():
-    """Test text cleaning function."""
-    # Test whitespace normalization
-    assert clean_text('  hello   world  \n\t  ') == 'hello world'
-
-    # Test empty string
-    assert clean_text('') == ''
-
-    # Test multiple spaces and newlines
-    assert clean_text('hello\n\nworld\n  !') == 'hello world !'
-
-def test_process_html_basic():
-    """Test processing of a basic HTML file."""
-    html_content = """
+# Canned pages, written once per session by the html_files fixture
+HTML_PAGES = {
+    'basic': """
     <html>
         <head>
             <title>Test Page</title>
@@ -31,20 +16,8 @@ def test_process_html_basic():
             </main>
         </body>
     </html>
-    """
-    test_file = os.path.join(TEST_DATA_DIR, 'basic.html')
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
-    with open(test_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    result = process_html(test_file)
-    assert result['title'] == 'Test Page'
-    assert 'main content' in result['content']
-    assert 'Welcome' in result['content']
-
-def test_process_html_with_unwanted_elements():
-    """Test removal of unwanted elements."""
-    html_content = """
+    """,
+    'with_unwanted': """
     <html>
         <head>
             <title>Test Page</title>
@@ -64,21 +37,8 @@ def test_process_html_with_unwanted_elements():
             <footer>Site Footer</footer>
         </body>
     </html>
-    """
-    test_file = os.path.join(TEST_DATA_DIR, 'with_unwanted.html')
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
-    with open(test_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    result = process_html(test_file)
-    assert 'Main content here' in result['content']
-    assert 'Site Header' not in result['content']
-    assert 'Navigation' not in result['content']
-    assert 'Site Footer' not in result['content']
-
-def test_process_html_fallback():
-    """Test fallback to body when no main content container found."""
-    html_content = """
+    """,
+    'no_main': """
     <html>
         <head>
             <title>Test Page</title>
@@ -89,13 +49,50 @@ def test_process_html_fallback():
             </div>
         </body>
     </html>
-    """
-    test_file = os.path.join(TEST_DATA_DIR, 'no_main.html')
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
-    with open(test_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    """,
+    'invalid': "Not valid HTML"
+}
 
-    result = process_html(test_file)
+@pytest.fixture(scope="session")
+def html_files(tmp_path_factory):
+    """Write the canned HTML pages once per session, keyed by name."""
+    directory = tmp_path_factory.mktemp("html")
+    files = {}
+    for name, html_content in HTML_PAGES.items():
+        files[name] = str(directory / f"{name}.html")
+        with open(files[name], 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    return files
+
+def test_clean_text():
+    """Test text cleaning function."""
+    # Test whitespace normalization
+    assert clean_text('  hello   world  \n\t  ') == 'hello world'
+
+    # Test empty string
+    assert clean_text('') == ''
+
+    # Test multiple spaces and newlines
+    assert clean_text('hello\n\nworld\n  !') == 'hello world !'
+
+def test_process_html_basic(html_files):
+    """Test processing of a basic HTML file."""
+    result = process_html(html_files['basic'])
+    assert result['title'] == 'Test Page'
+    assert 'main content' in result['content']
+    assert 'Welcome' in result['content']
+
+def test_process_html_with_unwanted_elements(html_files):
+    """Test removal of unwanted elements."""
+    result = process_html(html_files['with_unwanted'])
+    assert 'Main content here' in result['content']
+    assert 'Site Header' not in result['content']
+    assert 'Navigation' not in result['content']
+    assert 'Site Footer' not in result['content']
+
+def test_process_html_fallback(html_files):
+    """Test fallback to body when no main content container found."""
+    result = process_html(html_files['no_main'])
     assert 'content without main tag' in result['content']
 
 def test_process_html_missing_file():
@@ -103,23 +100,8 @@ def test_process_html_missing_file():
     with pytest.raises(FileNotFoundError):
         process_html('nonexistent.html')
 
-def test_process_html_invalid_content():
+def test_process_html_invalid_content(html_files):
     """Test handling of invalid HTML content."""
-    html_content = "Not valid HTML"
-    test_file = os.path.join(TEST_DATA_DIR, 'invalid.html')
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
-    with open(test_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    result = process_html(test_file)
+    result = process_html(html_files['invalid'])
     assert result['title'] == ''
     assert 'Not valid HTML' in result['content']
-
-@pytest.fixture(autouse=True)
-def cleanup():
-    """Clean up test files after each test."""
-    yield
-    if os.path.exists(TEST_DATA_DIR):
-        for file in os.listdir(TEST_DATA_DIR):
-            os.remove(os.path.join(TEST_DATA_DIR, file))
-        os.rmdir(TEST_DATA_DIR)
\ No newline at end of file
@@ -5,13 +5,9 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from search.processor.pdf import process_pdf, clean_text
 
-# Test data directory
-TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'test_data')
-
-def create_test_pdf(filename: str, pages: list[str], metadata: dict = None) -> str:
+def create_test_pdf(directory: str, filename: str, pages: list[str], metadata: dict = None) -> str:
     """Helper function to create test PDF files."""
-    test_file = os.path.join(TEST_DATA_DIR, filename)
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    test_file = os.path.join(directory, filename)
 
     # Create PDF with test content
     c = canvas.Canvas(test_file, pagesize=letter)
@@ -33,6 +29,41 @@ def create_test_pdf(filename: str, pages: list[str], metadata: dict = None) -> s
     c.save()
     return test_file
 
+@pytest.fixture(scope="session")
+def pdf_files(tmp_path_factory):
+    """Build the test PDFs once per session, keyed by name."""
+    directory = str(tmp_path_factory.mktemp("pdfs"))
+    files = {
+        'metadata_title': create_test_pdf(
+            directory,
+            'metadata_title.pdf',
+            ['Some content'],
+            metadata={'title': 'Test Document Title'}
+        ),
+        'basic': create_test_pdf(
+            directory,
+            'basic.pdf',
+            ['Page 1 content', 'Page 2 content'],
+            metadata={'title': 'Test Document'}
+        ),
+        'no_metadata': create_test_pdf(
+            directory,
+            'no_metadata.pdf',
+            ['This is page 1', 'This is page 2']
+        ),
+        'empty_pages': create_test_pdf(
+            directory,
+            'empty_pages.pdf',
+            ['', 'Some content', '']
+        )
+    }
+
+    files['invalid'] = os.path.join(directory, 'invalid.pdf')
+    with open(files['invalid'], 'w') as f:
+        f.write('Not a PDF file')
+
+    return files
+
 def test_clean_text():
     """Test text cleaning function."""
     # Test whitespace normalization
@@ -44,50 +75,28 @@ def test_clean_text():
     # Test multiple spaces and newlines
     assert clean_text('hello\n\nworld\n  !') == 'hello world !'
 
-def test_extract_title_from_metadata():
+def test_extract_title_from_metadata(pdf_files):
     """Test title extraction from PDF metadata."""
-    test_file = create_test_pdf(
-        'metadata_title.pdf',
-        ['Some content'],
-        metadata={'title': 'Test Document Title'}
-    )
-
-    result = process_pdf(test_file)
+    result = process_pdf(pdf_files['metadata_title'])
     assert result['title'] == 'Test Document Title'
 
-def test_process_pdf_basic():
+def test_process_pdf_basic(pdf_files):
     """Test processing of a basic PDF file."""
-    test_file = create_test_pdf(
-        'basic.pdf',
-        ['Page 1 content', 'Page 2 content'],
-        metadata={'title': 'Test Document'}
-    )
-
-    result = process_pdf(test_file)
+    result = process_pdf(pdf_files['basic'])
     assert result['title'] == 'Test Document'
     assert 'Page 1 content' in result['content']
     assert 'Page 2 content' in result['content']
 
-def test_process_pdf_no_metadata():
+def test_process_pdf_no_metadata(pdf_files):
     """Test processing PDF without metadata."""
-    test_file = create_test_pdf(
-        'no_metadata.pdf',
-        ['This is page 1', 'This is page 2']
-    )
-
-    result = process_pdf(test_file)
+    result = process_pdf(pdf_files['no_metadata'])
     assert result['title'] == 'untitled'
     assert 'This is page 1' in result['content']
     assert 'This is page 2' in result['content']
 
-def test_process_pdf_empty_pages():
+def test_process_pdf_empty_pages(pdf_files):
     """Test processing PDF with empty pages."""
-    test_file = create_test_pdf(
-        'empty_pages.pdf',
-        ['', 'Some content', '']
-    )
-
-    result = process_pdf(test_file)
+    result = process_pdf(pdf_files['empty_pages'])
     assert 'Some content' in result['content']
 
 def test_process_pdf_missing_file():
@@ -95,21 +104,7 @@ def test_process_pdf_missing_file():
     with pytest.raises(FileNotFoundError):
         process_pdf('nonexistent.pdf')
 
-def test_process_pdf_invalid_file():
+def test_process_pdf_invalid_file(pdf_files):
     """Test handling of invalid PDF file."""
-    test_file = os.path.join(TEST_DATA_DIR, 'invalid.pdf')
-    os.makedirs(TEST_DATA_DIR, exist_ok=True)
-    with open(test_file, 'w') as f:
-        f.write('Not a PDF file')
-
     with pytest.raises(ValueError):
-        process_pdf(test_file)
-
-@pytest.fixture(autouse=True)
-def cleanup():
-    """Clean up test files after each test."""
-    yield
-    if os.path.exists(TEST_DATA_DIR):
-        for file in os.listdir(TEST_DATA_DIR):
-            os.remove(os.path.join(TEST_DATA_DIR, file))
-        os.rmdir(TEST_DATA_DIR)
\ No newline at end of file
+        process_pdf(pdf_files['invalid'])
@@ -1,5 +1,7 @@
 """Tests for sitemap crawler."""
+import tempfile
 import unittest
+from lxml import etree
 from search.sitemap.crawler import WebsiteSitemapSpider
 
 class TestWebsiteSitemapSpider(unittest.TestCase):
@@ -7,7 +9,7 @@ class TestWebsiteSitemapSpider(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
-        self.spider = WebsiteSitemapSpider(url='https://example.com', output_dir='/tmp/test')
+        self.spider = WebsiteSitemapSpider(url='https://example.com', site_dir=tempfile.mkdtemp(), config={})
 
     def test_get_local_path(self):
         """Test local path generation for different URL patterns."""
@@ -46,6 +48,11 @@ class TestWebsiteSitemapSpider(unittest.TestCase):
             {
                 'url': 'https://dodoutdoors.com/products/',
                 'expected': 'html/products/index.html'
+            },
+            # Empty path segments are collapsed
+            {
+                'url': 'https://dodoutdoors.com/pages//faq',
+                'expected': 'html/pages/faq'
             }
         ]
 
@@ -58,5 +65,31 @@ class TestWebsiteSitemapSpider(unittest.TestCase):
                     f"For URL {test_case['url']}, expected {test_case['expected']}, but got {result}"
                 )
 
+class TestSitemapIterate(unittest.TestCase):
+    """Test cases for walking a parsed <urlset>."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.spider = WebsiteSitemapSpider(url='https://example.com', site_dir=tempfile.mkdtemp(), config={})
+
+    def test_iterate_large_urlset(self):
+        """Test that a large flat sitemap is walked once and pruned as it goes."""
+        count = 40000
+        urls = ''.join(
+            f'<url><loc>https://example.com/products/p{i}</loc><lastmod>2025-01-29</lastmod></url>'
+            for i in range(count)
+        )
+        root = etree.fromstring(
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode()
+        )
+
+        entries = list(self.spider._iterate(root))
+
+        self.assertEqual(len(entries), count)
+        self.assertEqual(entries[0]['loc'], 'https://example.com/products/p0')
+        self.assertEqual(entries[-1]['loc'], f'https://example.com/products/p{count - 1}')
+        # Extracted entries are dropped from the tree
+        self.assertLessEqual(len(root), 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
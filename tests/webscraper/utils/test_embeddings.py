@@ -5,12 +5,10 @@ from unittest.mock import Mock, patch
 from pymongo import MongoClient
 from search.utils.embeddings import EmbeddingsGenerator
 from search.utils.llm_cache import LLMCallCache
-from search.utils.config import load_config
 
 # Test configuration
 TEST_DB = "test_search"
 TEST_COLLECTION = "test_embeddings_cache"
-MONGO_URI = load_config()["mongodb"].get("test_uri", "mongodb://localhost:27017")
 
 # Mock OpenAI response
 class MockEmbeddingResponse:
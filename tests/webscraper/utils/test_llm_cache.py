@@ -1,115 +1,284 @@
 """Tests for embeddings cache."""
+import os
+import hashlib
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from datetime import datetime, timedelta
 from unittest.mock import patch
 from pymongo import MongoClient
+from pymongo.collection import Collection
 from search.utils.llm_cache import LLMCallCache
+from search.utils.embeddings import _vector_to_bytes, _vector_from_bytes
 from search.utils.config import load_config
 
-# Test configuration
-TEST_DB = "test_search"
+# Test configuration. Under pytest-xdist (pytest -n auto) each worker gets its
+# own database, so workers run in parallel and drop only their own data.
+_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEST_DB = f"test_search_{_WORKER}" if _WORKER else "test_search"
 TEST_COLLECTION = "test_embeddings_cache"
-MONGO_URI = load_config()["mongodb"].get("test_uri", "mongodb://localhost:27017")
+
+# Shared test vectors, contiguous float32 like the embeddings the cache stores
+_EMB = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+_EMBS = [np.array(v, dtype=np.float32) for v in ([1.0, 2.0], [3.0, 4.0], [5.0, 6.0])]
+
+def _assert_vector(actual, expected):
+    """Assert a cached value is a float32 ndarray equal to expected."""
+    assert isinstance(actual, np.ndarray) and actual.dtype == np.float32
+    assert np.array_equal(actual, expected)
+
+@pytest.fixture(scope="session")
+def mongo_uri():
+    """Test MongoDB URI, read from the config once per session."""
+    return load_config()["mongodb"].get("test_uri", "mongodb://localhost:27017")
+
+@pytest.fixture(scope="session")
+def mongo_client(mongo_uri):
+    """One MongoDB client shared by the whole session."""
+    client = MongoClient(mongo_uri, maxPoolSize=10)
+    yield client
+    client.close()
+
+@pytest.fixture(scope="session", autouse=True)
+def _drop_test_db(mongo_client):
+    """Drop the test database once, after the last test."""
+    yield
+    mongo_client.drop_database(TEST_DB)
 
 @pytest.fixture(scope="function")
-def test_cache():
+def test_cache(mongo_uri, mongo_client):
     """Create a test cache instance and cleanup after tests."""
     cache = LLMCallCache(
-        mongodb_uri=MONGO_URI,
+        mongodb_uri=mongo_uri,
         database=TEST_DB,
-        collection=TEST_COLLECTION
+        collection=TEST_COLLECTION,
+        client=mongo_client
     )
 
     yield cache
 
-    # Cleanup after test
-    cache.clear()
-    client = MongoClient(MONGO_URI)
-    client.drop_database(TEST_DB)
-    client.close()
+    # Empty the collection between tests; its indexes are kept. This also
+    # checks clear() after every test, including the in-memory entries.
+    assert cache.clear()
+    assert not cache._local
+    assert cache.collection.count_documents({}) == 0
 
 def test_cache_initialization(test_cache):
     """Test cache initialization and indexes."""
-    indexes = test_cache.collection.list_indexes()
-    index_names = [idx["name"] for idx in indexes]
+    index_names = {idx["name"] for idx in test_cache.collection.list_indexes()}
+
+    assert {"_id_", "text_hash_1_model_1", "created_at_1"} <= index_names
+
+def test_cache_index_creation_idempotent(test_cache, mongo_uri, mongo_client):
+    """Test that a second cache on the same collection skips index creation."""
+    with patch.object(Collection, "create_indexes") as create_indexes:
+        # The URI is ignored for a passed client, so it does not affect the key
+        LLMCallCache(
+            mongodb_uri="mongodb://placeholder",
+            database=TEST_DB,
+            collection=TEST_COLLECTION,
+            client=mongo_client
+        )
+
+    assert create_indexes.call_count == 0
+
+def test_cache_has_ttl_index(mongo_uri, mongo_client):
+    """Test that ttl_seconds makes created_at a TTL index."""
+    cache = LLMCallCache(
+        mongodb_uri=mongo_uri,
+        database=TEST_DB,
+        collection="test_ttl_cache",
+        client=mongo_client,
+        ttl_seconds=3600
+    )
 
-    assert "_id_" in index_names
-    assert "text_hash_1_model_1" in index_names
-    assert "created_at_1" in index_names
+    idx = next(i for i in cache.collection.list_indexes() if i["name"] == "created_at_1")
+    assert idx["expireAfterSeconds"] == 3600
+
+    # A later cache in the same process with another TTL updates it in place
+    LLMCallCache(
+        mongodb_uri=mongo_uri,
+        database=TEST_DB,
+        collection="test_ttl_cache",
+        client=mongo_client,
+        ttl_seconds=7200
+    )
+    idx = next(i for i in cache.collection.list_indexes() if i["name"] == "created_at_1")
+    assert idx["expireAfterSeconds"] == 7200
+
+def test_cache_expired_entries_miss(mongo_uri, mongo_client):
+    """Test that entries older than ttl_seconds are misses, in memory and in MongoDB."""
+    cache = LLMCallCache(
+        mongodb_uri=mongo_uri,
+        database=TEST_DB,
+        collection="test_ttl_cache",
+        client=mongo_client,
+        ttl_seconds=3600
+    )
+    model = "test-model"
+
+    # Written two hours ago; the TTL monitor may not have deleted it yet
+    [old_hash] = cache._compute_hashes(["old text"], model)
+    cache.collection.insert_one({
+        "text_hash": old_hash,
+        "model": model,
+        "value": cache.serialize(_EMB),
+        "format": cache.value_format,
+        "text": "old text",
+        "created_at": datetime.utcnow() - timedelta(hours=2)
+    })
+    assert cache.get("old text", model) is None
+
+    # A fresh entry is served from memory until it ages past the TTL
+    assert cache.set("new text", model, _EMB)
+    _assert_vector(cache.get("new text", model), _EMB)
+    key = (cache._compute_hashes(["new text"], model)[0], model)
+    cache._local[key] = (datetime.utcnow() - timedelta(hours=2), _EMB)
+    cache.collection.delete_many({})
+    assert cache.get("new text", model) is None
 
 def test_cache_set_get(test_cache):
-    """Test basic set and get operations."""
+    """Test basic set and get operations through the batch API."""
     text = "test text"
     model = "test-model"
-    embedding = np.array([1.0, 2.0, 3.0])
+    embedding = _EMB
 
     # Test set
-    assert test_cache.set(text, model, embedding)
+    assert test_cache.set_many([text], model, [embedding])
 
     # Test get
-    cached = test_cache.get(text, model)
-    assert cached is not None
-    np.testing.assert_array_equal(cached, embedding)
+    [(pos, cached)] = test_cache.get_many([text], model)
+    assert pos == 0
+    _assert_vector(cached, embedding)
+
+def test_cache_set_get_single(test_cache):
+    """Test the single-item set and get wrappers."""
+    text = "test text"
+    model = "test-model"
+    embedding = _EMB
+
+    assert test_cache.set(text, model, embedding)
+    _assert_vector(test_cache.get(text, model), embedding)
+
+def test_cache_storage_is_binary(test_cache, mongo_uri, mongo_client):
+    """Test that embeddings are stored as raw float32 bytes and decoded as a view."""
+    cache = LLMCallCache[np.ndarray](
+        mongodb_uri=mongo_uri,
+        database=TEST_DB,
+        collection=TEST_COLLECTION,
+        serialize=_vector_to_bytes,
+        deserialize=_vector_from_bytes,
+        value_format="float32",
+        client=mongo_client
+    )
+    assert cache.set("text", "test-model", _EMB)
+
+    doc = test_cache.collection.find_one({})
+    assert doc["format"] == "float32"
+    assert isinstance(doc["value"], bytes)
+    assert len(doc["value"]) == _EMB.nbytes
+
+    # Decoding is one frombuffer over the stored bytes, not a copy per element
+    cache._local.clear()
+    [(_, cached)] = cache.get_many(["text"], "test-model")
+    assert not cached.flags.owndata
+    _assert_vector(cached, _EMB)
+
+def test_cache_key_format(test_cache):
+    """Test that keys stay the SHA-256 hex of "text:model" used by existing entries."""
+    assert test_cache.set("text", "test-model", _EMB)
+
+    doc = test_cache.collection.find_one({})
+    assert doc["text_hash"] == hashlib.sha256(b"text:test-model").hexdigest()
 
 def test_cache_get_many(test_cache):
     """Test batch get operations."""
     texts = ["text1", "text2", "text3"]
     model = "test-model"
-    embeddings = [
-        np.array([1.0, 2.0]),
-        np.array([3.0, 4.0]),
-        np.array([5.0, 6.0])
-    ]
+    embeddings = _EMBS
 
     # Set multiple embeddings
     test_cache.set_many(texts, model, embeddings)
 
     # Test get_many
     results = test_cache.get_many(texts, model)
-    assert len(results) == len(texts)
+    assert [pos for pos, _ in results] == list(range(len(texts)))
 
-    for (pos, embedding), expected in zip(results, embeddings):
-        assert embedding is not None
-        np.testing.assert_array_equal(embedding, expected)
+    # Compare all hits at once
+    found = [embedding for _, embedding in results]
+    assert all(embedding is not None for embedding in found)
+    _assert_vector(np.stack(found), np.stack(embeddings))
+
+@pytest.mark.parametrize("n", [1, 100, 1000])
+def test_cache_set_many_bulk(test_cache, n):
+    """Test batch writes large enough to exercise the bulk insert path."""
+    rng = np.random.default_rng(0)
+    texts = [f"text{i}" for i in range(n)]
+    model = "test-model"
+    embeddings = list(rng.random((n, 384), dtype=np.float32))
+
+    assert test_cache.set_many(texts, model, embeddings)
+    assert test_cache.collection.count_documents({"model": model}) == n
+
+    # Read back from MongoDB rather than the local LRU
+    test_cache._local.clear()
+    results = test_cache.get_many(texts, model)
+    assert [pos for pos, _ in results] == list(range(n))
+    found = [embedding for _, embedding in results]
+    assert all(embedding is not None for embedding in found)
+    _assert_vector(np.stack(found), np.stack(embeddings))
+
+def test_cache_concurrent_reads(test_cache, mongo_uri, mongo_client):
+    """Test concurrent reads sharing one connection pool."""
+    texts = [f"text{i}" for i in range(100)]
+    model = "test-model"
+    test_cache.set_many(texts, model, [_EMB] * len(texts))
+
+    # No local LRU, so every read goes to MongoDB. 32 threads share the
+    # session client's pool of 10 connections.
+    cache = LLMCallCache(
+        mongodb_uri=mongo_uri,
+        database=TEST_DB,
+        collection=TEST_COLLECTION,
+        local_size=0,
+        client=mongo_client
+    )
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(lambda text: cache.get(text, model), texts * 10))
+
+    assert len(results) == 10 * len(texts)
+    for embedding in results:
+        _assert_vector(embedding, _EMB)
 
 def test_cache_cleanup_before(test_cache):
     """Test cleanup of entries before timestamp."""
     text1 = "old text"
     text2 = "new text"
     model = "test-model"
-    embedding = np.array([1.0, 2.0, 3.0])
+    embedding = _EMB
 
-    # Set with old timestamp
+    # Write the old entry directly, in the same schema set_many uses
     old_time = datetime.utcnow() - timedelta(days=7)
-    with patch('search.utils.llm_cache.datetime') as mock_datetime:
-        mock_datetime.utcnow.return_value = old_time
-        test_cache.set(text1, model, embedding)
+    [old_hash] = test_cache._compute_hashes([text1], model)
+    test_cache.collection.insert_one({
+        "text_hash": old_hash,
+        "model": model,
+        "value": test_cache.serialize(embedding),
+        "format": test_cache.value_format,
+        "text": text1,
+        "created_at": old_time
+    })
 
     # Set with current timestamp
-    test_cache.set(text2, model, embedding)
+    test_cache.set_many([text2], model, [embedding])
 
     # Cleanup entries older than 3 days
     cleanup_time = datetime.utcnow() - timedelta(days=3)
     stats = test_cache.cleanup_before(cleanup_time)
 
-    # Verify cleanup
+    # Verify cleanup with indexed counts; no payload is decoded
     assert stats["deleted_count"] == 1
-    assert test_cache.get(text1, model) is None  # Old entry should be gone
-    assert test_cache.get(text2, model) is not None  # New entry should remain
-
-def test_cache_clear(test_cache):
-    """Test clearing all cache entries."""
-    text = "test text"
-    model = "test-model"
-    embedding = np.array([1.0, 2.0, 3.0])
-
-    # Add entry
-    test_cache.set(text, model, embedding)
-    assert test_cache.get(text, model) is not None
-
-    # Clear cache
-    assert test_cache.clear()
-
-    # Verify cache is empty
-    assert test_cache.get(text, model) is None
\ No newline at end of file
+    [new_hash] = test_cache._compute_hashes([text2], model)
+    count = test_cache.collection.count_documents
+    assert count({"text_hash": old_hash, "model": model}, limit=1) == 0  # Old entry should be gone
+    assert count({"text_hash": new_hash, "model": model}, limit=1) == 1  # New entry should remain
@@ -2,40 +2,31 @@
 import pytest
 from search.utils.product_utils import get_product_handle
 
-def test_get_product_handle_simple():
-    """Test extracting handle from simple product URL."""
-    url = "https://example.com/products/blue-shirt"
-    assert get_product_handle(url) == "blue-shirt"
-
-def test_get_product_handle_with_trailing_slash():
-    """Test URL with trailing slash."""
-    url = "https://example.com/products/blue-shirt/"
-    assert get_product_handle(url) == "blue-shirt"
-
-def test_get_product_handle_with_query_params():
-    """Test URL with query parameters."""
-    url = "https://example.com/products/blue-shirt?size=L&color=blue"
-    assert get_product_handle(url) == "blue-shirt"
-
-def test_get_product_handle_with_fragment():
-    """Test URL with fragment."""
-    url = "https://example.com/products/blue-shirt#details"
-    assert get_product_handle(url) == "blue-shirt"
-
-def test_get_product_handle_complex_path():
-    """Test URL with multiple path segments."""
-    url = "https://example.com/shop/products/mens/shirts/blue-shirt"
-    assert get_product_handle(url) == "blue-shirt"
-
-def test_get_product_handle_encoded_chars():
-    """Test URL with encoded characters."""
-    url = "https://example.com/products/blue%20shirt"
-    assert get_product_handle(url) == "blue%20shirt"
-
-def test_get_product_handle_special_chars():
-    """Test URL with special characters."""
-    url = "https://example.com/products/blue-shirt-2.0"
-    assert get_product_handle(url) == "blue-shirt-2.0"
+@pytest.mark.parametrize("url,expected", [
+    # Simple product URL
+    ("https://example.com/products/blue-shirt", "blue-shirt"),
+    # Trailing slash
+    ("https://example.com/products/blue-shirt/", "blue-shirt"),
+    # Query parameters
+    ("https://example.com/products/blue-shirt?size=L&color=blue", "blue-shirt"),
+    # Fragment
+    ("https://example.com/products/blue-shirt#details", "blue-shirt"),
+    # Multiple path segments
+    ("https://example.com/shop/products/mens/shirts/blue-shirt", "blue-shirt"),
+    # Encoded characters
+    ("https://example.com/products/blue%20shirt", "blue%20shirt"),
+    # Special characters
+    ("https://example.com/products/blue-shirt-2.0", "blue-shirt-2.0"),
+    # Path parameters
+    ("https://example.com/products/blue-shirt;v=1", "blue-shirt"),
+    # Invalid URL
+    ("not-a-url", "not-a-url"),
+    # Unicode characters
+    ("https://example.com/products/blue-shirt-üニコード", "blue-shirt-üニコード"),
+])
+def test_get_product_handle(url, expected):
+    """Test extracting the product handle from a URL."""
+    assert get_product_handle(url) == expected
 
 @pytest.mark.skip(reason="This test is not working")
 def test_get_product_handle_empty_path():
@@ -43,13 +34,3 @@ def test_get_product_handle_empty_path():
     url = "https://example.com"
     with pytest.raises(IndexError):
         get_product_handle(url)
-
-def test_get_product_handle_invalid_url():
-    """Test invalid URL."""
-    url = "not-a-url"
-    assert get_product_handle(url) == "not-a-url"
-
-def test_get_product_handle_unicode():
-    """Test URL with unicode characters."""
-    url = "https://example.com/products/blue-shirt-üニコード"
-    assert get_product_handle(url) == "blue-shirt-üニコード"
\ No newline at end of file